@@ -3,11 +3,14 @@ __author__ = ['Alvin Leung', 'Victoria Barenne']
 import streamlit as st
 from streamlit import session_state as ss
 from streamlit_pdf_viewer import pdf_viewer
-import pdfplumber
 import pandas as pd
-from pathlib import Path
+import hashlib
+import math
 
-from data_connector import base_connector, cio_connector, ciomonthly_connector, cmo_connector, equitydeepdive_connector, equityswitch_connector, equitytoppicks_connector, rf_connector, rw_connector, wire_connector
+from data_connector.document_router import route
+from settings import APP_CACHE_ENTRIES
+from utils.pdf_helper.parsed_document import ParsedDocument
+from data_connector.connector_registry import get_connector
 
 st.set_page_config(layout="wide")
 st.title("PDF Text Parser Visualisation")
@@ -16,22 +19,75 @@ st.title("PDF Text Parser Visualisation")
 if 'pdf_ref' not in ss:
     ss.pdf_ref = None
 
-document_type_list = {'Baer Insight Equity Research': equitydeepdive_connector.EquityDeepDiveConnector,
-                        'Baer Insight Equity Research India': equitydeepdive_connector.EquityDeepDiveConnector,
-                        'Equity Switch': equityswitch_connector.EquitySwitchConnector, # TODO download for testing
-                        'Equity Top Picks': equitytoppicks_connector.EquityTopPicksConnector, # TODO download for testing
-                        'Market Opportunity - Single Equities': cmo_connector.CMOConnector,
-                        'Research Weekly': rw_connector.RWConnector,
-                        'The Wire': wire_connector.WireConnector,
-                        'CIO Weekly': cio_connector.CIOConnector, # TODO download for testing
-                        'CIO Monthly': ciomonthly_connector.CIOMonthlyConnector # TODO download for testing
+# connector registry name of each document type; a connector is only imported once a document of its type is parsed
+document_type_list = {'Baer Insight Equity Research': 'equitydeepdive',
+                        'Baer Insight Equity Research India': 'equitydeepdive',
+                        'Equity Switch': 'equityswitch', # TODO download for testing
+                        'Equity Top Picks': 'equitytoppicks', # TODO download for testing
+                        'Market Opportunity - Single Equities': 'cmo',
+                        'Research Weekly': 'rw',
+                        'The Wire': 'wire',
+                        'CIO Weekly': 'cio', # TODO download for testing
+                        'CIO Monthly': 'ciomonthly', # TODO download for testing
+                        'Research Focus': 'rf'
                         }
+# document type of each connector found by the document router
+routed_document_types = {'equitydeepdive': 'Baer Insight Equity Research', 'equityswitch': 'Equity Switch',
+                         'equitytoppicks': 'Equity Top Picks', 'cmo': 'Market Opportunity - Single Equities',
+                         'rw': 'Research Weekly', 'wire': 'The Wire', 'cio': 'CIO Weekly', 'ciomonthly': 'CIO Monthly',
+                         'rf': 'Research Focus'}
+auto_detect = 'Auto-detect'
 
 # Upload PDF file
-connector_type = st.selectbox("Connector Type", options = document_type_list.keys())
-connector = document_type_list[connector_type]
+connector_type = st.selectbox("Connector Type", options = [auto_detect, *document_type_list.keys()])
 uploaded_file = st.file_uploader("Choose a PDF file", type="pdf", key="pdf")
 
+# connectors returning document components rather than sections
+component_document_types = {'Baer Insight Equity Research', 'Baer Insight Equity Research India', 'Equity Switch',
+                            'Equity Top Picks', 'Market Opportunity - Single Equities'}
+
+
+# shared by all sessions and reruns; keyed by the file hash, as streamlit does not hash the underscored bytes
+@st.cache_data(max_entries=APP_CACHE_ENTRIES, show_spinner=False)
+def parse_document(file_hash, connector_type, file_name, _binary_data):
+    connector = get_connector(document_type_list[connector_type])
+    if connector_type in component_document_types:
+        return connector.get_all_components(_binary_data, name=file_name)
+    return connector.get_json_all(_binary_data, name=file_name)
+
+
+@st.cache_data(max_entries=APP_CACHE_ENTRIES, show_spinner=False)
+def detect_connector_type(file_hash, file_name, _binary_data):
+    detected_type = route(_binary_data, name=file_name)
+    return routed_document_types.get(detected_type)
+
+
+@st.cache_data(max_entries=APP_CACHE_ENTRIES, show_spinner=False)
+def get_page_count(file_hash, _binary_data):
+    with ParsedDocument(_binary_data) as doc:
+        return doc.page_count
+
+
+def select_pages(page_list, file_hash):
+    """The pages of `page_list` in the current view; only these are rendered. Each file starts at its first view."""
+    col1, col2 = st.columns(2)
+    with col1:
+        pages_per_view = st.selectbox("Pages per view", options = [1, 5, 10, 20], index = 1, key = "pages_per_view")
+    view_count = max(math.ceil(len(page_list) / pages_per_view), 1)
+    view_key = f"view_{file_hash}"
+    # the view kept from before may be past the last one, e.g. after showing more pages per view
+    if ss.get(view_key, 1) > view_count:
+        ss[view_key] = view_count
+    with col2:
+        view = st.number_input(f"View (of {view_count})", min_value = 1, max_value = view_count, key = view_key)
+    start = (view - 1) * pages_per_view
+    return page_list[start:start + pages_per_view]
+
+
+def show_page(binary_data, page_nbr):
+    pdf_viewer(input=binary_data, pages_to_render=[page_nbr], width=900)
+
+
 def create_dataframe_from_non_none_elements(data_dict_list):
     assert len(data_dict_list) > 0
     data_dict = data_dict_list[0]
@@ -50,38 +106,44 @@ if ss.pdf_ref:
     file_name = ss.pdf_ref.name
     doc_type = file_name.split('-')[0].split(' India')[0]
     binary_data = ss.pdf_ref.getvalue()  # Read binary data
+    file_hash = hashlib.sha256(binary_data).hexdigest()
+
+    if connector_type == auto_detect:
+        connector_type = detect_connector_type(file_hash, file_name, binary_data)
+        if connector_type is None:
+            st.error("The document type could not be detected, please select the connector type")
+            st.stop()
+        st.info(f"Detected document type: {connector_type}")
 
     with st.spinner('Processing...'):
-        # Save the uploaded file temporarily
-        temp_path = Path(f"temp_{file_name}")
-        with open(temp_path, "wb") as temp_file:
-            temp_file.write(ss.pdf_ref.getbuffer())
+        parsed = parse_document(file_hash, connector_type, file_name, binary_data)
 
     if connector_type == "Equity Top Picks":
-        equity_extractions, deletions_table, metadata, equity_pages_no, deletion_pages_no = connector.get_all_components(str(temp_path))
+        equity_extractions, deletions_table, metadata, equity_pages_no, deletion_pages_no = parsed
         st.table(metadata)
-        equity_counter, deletions_counter = 0, 0
-        for page_nbr in range(1, len(binary_data)+1):
-            if page_nbr in deletion_pages_no or page_nbr in equity_pages_no:
-                col1, col2 = st.columns([3, 4])
-                with col1: 
-                    if page_nbr in deletion_pages_no:
-                        st.table(deletions_table[deletions_counter])
-                        deletions_counter +=1
-                    elif page_nbr in equity_pages_no: 
-                        title, key_info, investment_thesis, company_profile = equity_extractions[equity_counter]
-                        equity_counter +=1
-                        st.header(title)
-                        st.table(key_info)
-                        st.subheader("Company Profile")
-                        st.write(company_profile)
-                        st.subheader("Investment Thesis")
-                        st.write(investment_thesis)     
-                with col2:
-                    binary_data = ss.pdf_ref.getvalue()  # Read binary data
-                    pdf_viewer(input=binary_data, pages_to_render=[page_nbr], width=900)
+        # extractions come in page order
+        deletions_by_page = dict(zip(sorted(deletion_pages_no), deletions_table))
+        equity_by_page = dict(zip(sorted(equity_pages_no), equity_extractions))
+        page_count = get_page_count(file_hash, binary_data)
+        review_pages = [page_nbr for page_nbr in range(1, page_count + 1)
+                        if page_nbr in deletions_by_page or page_nbr in equity_by_page]
+        for page_nbr in select_pages(review_pages, file_hash):
+            col1, col2 = st.columns([3, 4])
+            with col1: 
+                if page_nbr in deletions_by_page:
+                    st.table(deletions_by_page[page_nbr])
+                else: 
+                    title, key_info, investment_thesis, company_profile = equity_by_page[page_nbr]
+                    st.header(title)
+                    st.table(key_info)
+                    st.subheader("Company Profile")
+                    st.write(company_profile)
+                    st.subheader("Investment Thesis")
+                    st.write(investment_thesis)     
+            with col2:
+                show_page(binary_data, page_nbr)
     elif connector_type in ['Baer Insight Equity Research', 'Baer Insight Equity Research India']:
-        equity_json, metadata, investment_thesis, company_profile, free_text, strengths, weaknesses, opportunities, threats = connector.get_all_components(str(temp_path))
+        equity_json, metadata, investment_thesis, company_profile, free_text, strengths, weaknesses, opportunities, threats = parsed
         st.table(metadata)
         col1, col2 = st.columns([3, 4])
         with col1: 
@@ -94,27 +156,24 @@ if ss.pdf_ref:
             st.subheader("Equity Information")
             st.write(pd.json_normalize(equity_json).T)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[1], width=900)
+            show_page(binary_data, 1)
         col1, col2 = st.columns([3, 4])
         with col1: 
             for key, text in {"Strengths": strengths, "Weaknesses": weaknesses, "Opportunities": opportunities, "Threats": threats}.items():
                 st.subheader(key)
                 st.write(text)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[2], width=900)
+            show_page(binary_data, 2)
 
     elif connector_type == "Market Opportunity - Single Equities":
-        equity_json, metadata, company_profile, market_opportunity, key_risks = connector.get_all_components(str(temp_path))
+        equity_json, metadata, company_profile, market_opportunity, key_risks = parsed
         st.table(metadata)
         col1, col2 = st.columns([3, 4])
         with col1: 
             st.subheader("Market Opportunity")
             st.write(market_opportunity)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[1], width=900)
+            show_page(binary_data, 1)
         col1, col2 = st.columns([3, 4])
         with col1: 
             st.subheader("Company Profile")
@@ -124,11 +183,10 @@ if ss.pdf_ref:
             st.subheader("Equity Information")
             st.write(pd.json_normalize(equity_json).T)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[2], width=900)
+            show_page(binary_data, 2)
                 
     elif connector_type == "Equity Switch":
-        equity_json1, equity_json2, metadata, whats_the_story, header1, text1, header2, text2, comparaison_table = connector.get_all_components(str(temp_path))
+        equity_json1, equity_json2, metadata, whats_the_story, header1, text1, header2, text2, comparaison_table = parsed
         st.table(metadata)
         col1, col2 = st.columns([3, 4])
         with col1: 
@@ -139,8 +197,7 @@ if ss.pdf_ref:
             st.subheader(header2)
             st.write(text2)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[1], width=900)
+            show_page(binary_data, 1)
         col1, col2 = st.columns([3, 4])
         with col1: 
             st.subheader(f"Equity Information {equity_json1['equity']}")
@@ -148,52 +205,27 @@ if ss.pdf_ref:
             st.subheader(f"Equity Information {equity_json2['equity']}")
             st.write(pd.json_normalize(equity_json2).T)
         with col2:
-            binary_data = ss.pdf_ref.getvalue()  # Read binary data
-            pdf_viewer(input=binary_data, pages_to_render=[2], width=900)
+            show_page(binary_data, 2)
             st.table(comparaison_table)
 
     
     
     else:
-        outputs = connector.get_json_all(str(temp_path))
+        outputs = parsed
 
         # Filter and display outputs table
         st.table(create_dataframe_from_non_none_elements(outputs))
         
-        # Iterate through the outputs and group by page number
-        current_page = None
-        sections = []
-
+        # Group the outputs by page number
+        sections_by_page = {}
         for output in outputs:
-            page_number = output['page_number']
-
-            if current_page is None:
-                current_page = page_number
-
-            if page_number != current_page:
-                # Display the previous page's content
-                st.subheader(f"Page {current_page}")
-                col1, col2 = st.columns([3, 4])
-                with col1:
-                    for section in sections:
-                        st.write(section)
-                with col2:
-                    binary_data = ss.pdf_ref.getvalue()  # Read binary data
-                    pdf_viewer(input=binary_data, pages_to_render=[current_page], width=900)
-
-                # Reset for the new page
-                current_page = page_number
-                sections = []
-
-            sections.append(output['section_text'])
-
-        # Display the last page's content
-        if sections:
-            st.subheader(f"Page {current_page}")
+            sections_by_page.setdefault(output['page_number'], []).append(output['section_text'])
+
+        for page_nbr in select_pages(list(sections_by_page), file_hash):
+            st.subheader(f"Page {page_nbr}")
             col1, col2 = st.columns([3, 4])
             with col1:
-                for section in sections:
+                for section in sections_by_page[page_nbr]:
                     st.write(section)
             with col2:
-                binary_data = ss.pdf_ref.getvalue()  # Read binary data
-                pdf_viewer(input=binary_data, pages_to_render=[current_page], width=900)
\ No newline at end of file
+                show_page(binary_data, page_nbr)
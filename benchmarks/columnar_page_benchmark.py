@@ -0,0 +1,78 @@
+"""Memory and coordinate filtering of `ColumnarPage` against the pdfminer layout tree it is built from.
+
+    python -m benchmarks.columnar_page_benchmark <pdf_dir> [repeat]
+
+Lays out every page of every PDF, measures the memory held by the `LTPage` trees and by their
+columnar counterparts with tracemalloc, checks that the helpers give the same results on both,
+then times a connector-style coordinate filter as a comprehension and as a vectorised mask.
+"""
+import os
+import sys
+import time
+import tracemalloc
+from pdfminer.layout import LTTextBoxHorizontal, LTTextContainer
+
+from utils.pdf_helper.columnar_page import ColumnarPage
+from utils.pdf_helper.parsed_document import ParsedDocument
+from utils.pdf_helper.text_helper import get_char_colors, get_colors, is_footer
+
+LEFT_SEC_X0 = 300
+YMIN = 50
+
+
+def get_pages(pdf_dir) -> list:
+    pages = []
+    for file in sorted(os.listdir(pdf_dir)):
+        if file.lower().endswith('.pdf'):
+            with ParsedDocument(os.path.join(pdf_dir, file), layout_cache=False) as doc:
+                pages.extend(doc.layout_tree(index) for index in range(doc.page_count))
+    return pages
+
+
+def get_helper_results(page) -> list:
+    return [(el.bbox, el.get_text(), is_footer(el), get_colors(el), get_char_colors(el))
+            for el in page if isinstance(el, LTTextContainer)]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(pdf_dir, repeat=20):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    pages = get_pages(pdf_dir)
+    tree_bytes = tracemalloc.get_traced_memory()[0] - before
+    before = tracemalloc.get_traced_memory()[0]
+    columnar_pages = [ColumnarPage.from_layout(page) for page in pages]
+    columnar_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f'{len(pages)} pages: LTPage {tree_bytes / len(pages) / 1024:.1f} KiB/page, '
+          f'ColumnarPage {columnar_bytes / len(pages) / 1024:.1f} KiB/page (x{tree_bytes / columnar_bytes:.1f})')
+
+    for page, columnar_page in zip(pages, columnar_pages):
+        assert get_helper_results(columnar_page) == get_helper_results(page), 'helpers differ on the columnar page'
+
+    expected, loop_time = timed(lambda: [[el.get_text() for el in page if isinstance(el, LTTextBoxHorizontal)
+                                          and el.y0 >= YMIN and el.x0 < LEFT_SEC_X0] for page in columnar_pages], repeat)
+    vectorised, mask_time = timed(lambda: [[el.get_text() for el in page.where(
+        page.is_instance(LTTextBoxHorizontal) & (page.y0 >= YMIN) & (page.x0 < LEFT_SEC_X0))]
+        for page in columnar_pages], repeat)
+    assert vectorised == expected, 'vectorised filter differs from the comprehension'
+    print(f'coordinate filter: comprehension {loop_time * 1000:.2f} ms, mask {mask_time * 1000:.2f} ms '
+          f'(x{loop_time / mask_time:.1f})')
+
+    expected, loop_time = timed(lambda: [[is_footer(el) for el in page if isinstance(el, LTTextContainer)]
+                                         for page in columnar_pages], repeat)
+    vectorised, mask_time = timed(lambda: [page.footer_mask()[page.is_instance(LTTextContainer)].tolist()
+                                           for page in columnar_pages], repeat)
+    assert vectorised == expected, 'footer mask differs from is_footer'
+    print(f'is_footer: per element {loop_time * 1000:.2f} ms, footer_mask {mask_time * 1000:.2f} ms '
+          f'(x{loop_time / mask_time:.1f})')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:3]])
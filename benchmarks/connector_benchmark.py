@@ -0,0 +1,168 @@
+"""Speed and memory of every connector over a fixed local corpus, saved as JSON to compare commits.
+
+    python -m benchmarks.connector_benchmark <corpus_dir> [output.json] [connector ...]
+    python -m benchmarks.connector_benchmark compare <before.json> <after.json>
+
+The corpus holds one folder of PDFs per connector, named as in `CONNECTORS` of the connector registry
+(`base`, `rw`, `wire`, ...); missing folders are skipped. Each document is opened and run through its connector as the
+pipeline does, with the layout cache disabled. Wall time is split into opening (xref and page tree
+parsing), layout analysis and connector logic, and reported with pages/s and sections/s. Peak
+memory is measured by tracemalloc in a second pass, so that tracing does not inflate the timings.
+Results are tagged with the commit and written to `benchmarks/results/` by default.
+
+Only the connector modules are imported: no Azure settings or network access are needed.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import pdfminer
+
+from data_connector.connector_registry import CONNECTORS, get_connector
+from utils.pdf_helper.parsed_document import ParsedDocument
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class TimedDocument(ParsedDocument):
+    """`ParsedDocument` that adds up the time spent in layout analysis."""
+
+    def __init__(self, *args, **kwargs):
+        self.layout_seconds = 0.0
+        super().__init__(*args, **kwargs)
+
+    def layout_tree(self, index):
+        start = time.perf_counter()
+        try:
+            return super().layout_tree(index)
+        finally:
+            self.layout_seconds += time.perf_counter() - start
+
+
+def uses_components(connector) -> bool:
+    base = get_connector('base')
+    return connector.get_components_from_document.__func__ is not base.get_components_from_document.__func__
+
+
+def run_document(connector, fp) -> dict:
+    """Time one document; `sections` is None for the connectors that return components instead of sections."""
+    start = time.perf_counter()
+    doc = TimedDocument(fp, page_numbers=connector.page_numbers, layout_cache=False)
+    opened = time.perf_counter()
+    try:
+        if uses_components(connector):
+            connector.get_components_from_document(doc)
+            sections = None
+        else:
+            sections = len(connector.get_json_from_document(doc))
+    finally:
+        doc.close()
+    end = time.perf_counter()
+    return {'open_s': opened - start, 'layout_s': doc.layout_seconds,
+            'logic_s': end - opened - doc.layout_seconds, 'pages': doc.pages_laid_out, 'sections': sections}
+
+
+def run_connector(name, fp_list, memory=True) -> dict:
+    connector = get_connector(name)
+    totals = {'documents': 0, 'failed': 0, 'pages': 0, 'sections': 0, 'open_s': 0.0, 'layout_s': 0.0, 'logic_s': 0.0}
+    errors = []
+    start = time.perf_counter()
+    for fp in fp_list:
+        try:
+            result = run_document(connector, fp)
+        except Exception as e:
+            totals['failed'] += 1
+            errors.append(f'{os.path.basename(fp)}: {e}')
+            continue
+        totals['documents'] += 1
+        for key in ('open_s', 'layout_s', 'logic_s', 'pages'):
+            totals[key] += result[key]
+        totals['sections'] = None if result['sections'] is None else totals['sections'] + result['sections']
+    wall = time.perf_counter() - start
+
+    totals.update({'wall_s': wall, 'pages_per_s': totals['pages'] / wall if wall else 0.0,
+                   'sections_per_s': None if totals['sections'] is None else totals['sections'] / wall,
+                   'errors': errors[:10]})
+    if memory:
+        tracemalloc.start()
+        for fp in fp_list:
+            try:
+                run_document(connector, fp)
+            except Exception:
+                pass
+        totals['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return totals
+
+
+def get_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def list_pdfs(folder) -> list:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith('.pdf'))
+
+
+def main(corpus_dir, output_path=None, connectors=None, memory=True):
+    run = {**get_commit(), 'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+           'python': platform.python_version(), 'pdfminer': pdfminer.__version__,
+           'corpus': os.path.abspath(corpus_dir), 'connectors': {}}
+    print(f"{'connector':>15} {'docs':>5} {'failed':>6} {'pages':>6} {'wall s':>8} {'open s':>7} {'layout s':>9} {'logic s':>8} "
+          f"{'pages/s':>8} {'sections/s':>11} {'peak MiB':>9}")
+    for name in connectors or CONNECTORS:
+        folder = os.path.join(corpus_dir, name)
+        if not os.path.isdir(folder):
+            continue
+        try:
+            result = run_connector(name, list_pdfs(folder), memory)
+        except ImportError as e:
+            print(f'{name:>15} skipped: {e}')
+            run['connectors'][name] = {'skipped': str(e)}
+            continue
+        run['connectors'][name] = result
+        sections_per_s = '-' if result['sections_per_s'] is None else f"{result['sections_per_s']:.1f}"
+        peak = result.get('peak_memory_bytes', 0) / 1024 ** 2
+        print(f"{name:>15} {result['documents']:>5} {result['failed']:>6} {result['pages']:>6} {result['wall_s']:>8.2f} {result['open_s']:>7.2f} "
+              f"{result['layout_s']:>9.2f} {result['logic_s']:>8.2f} {result['pages_per_s']:>8.1f} {sections_per_s:>11} {peak:>9.1f}")
+
+    if output_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output_path = os.path.join(RESULTS_DIR, f"connectors-{(run['commit'] or 'unknown')[:10]}.json")
+    with open(output_path, 'w') as output_file:
+        json.dump(run, output_file, indent=2)
+    print(f'Results written to {output_path}')
+    return run
+
+
+def compare(before_path, after_path):
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print(f"{(before['commit'] or '?')[:10]} -> {(after['commit'] or '?')[:10]}")
+    print(f"{'connector':>15} {'pages/s':>17} {'layout s':>17} {'logic s':>17} {'peak MiB':>17}")
+    for name, new in after['connectors'].items():
+        old = before['connectors'].get(name)
+        if old is None or 'skipped' in old or 'skipped' in new:
+            continue
+        cells = []
+        for key, scale in (('pages_per_s', 1), ('layout_s', 1), ('logic_s', 1), ('peak_memory_bytes', 1024 ** 2)):
+            if key in old and key in new:
+                cells.append(f'{old[key] / scale:7.1f} -> {new[key] / scale:7.1f}')
+            else:
+                cells.append(f"{'-':>17}")
+        print(f'{name:>15} ' + ' '.join(cells))
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'compare':
+        compare(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1], *sys.argv[2:3], *([sys.argv[3:]] if len(sys.argv) > 3 else []))
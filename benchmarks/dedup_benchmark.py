@@ -0,0 +1,72 @@
+"""Embedding volume saved by the near-duplicate index over weekly issues that republish sections.
+
+    python -m benchmarks.dedup_benchmark [weeks] [sections] [republished] [threshold]
+
+Each week (default 8 weeks of 200 sections) republishes a `republished` share (default 0.4) of the
+previous week's sections, half verbatim and half with one word changed, and adds new ones. The
+sections go through `DataProcessPipeline.embed_sections` with the local hash provider and an
+in-memory index. Printed per week: sections embedded and reused, and the lowest cosine similarity
+between a reused vector and the vector the section would have had.
+"""
+import random
+import sys
+import time
+import uuid
+
+from benchmarks.synthetic_corpus import TextSource
+from pipelines.data_load_pipeline import DataProcessPipeline
+from utils.embedding_helper.provider_helper import HashEmbeddingProvider
+
+
+def make_section(text: TextSource, header: str, body: str, week: int) -> dict:
+    return {'id': str(uuid.uuid4()), 'publication_date': f'2023-01-{week + 1:02d}', 'source_document': f'week{week}.pdf',
+            'series': 'Research Weekly', 'page_number': '1-1', 'document_name': f'Research Weekly {week}',
+            'section_title': '', 'section_header': header, 'section_subcategory': '', 'section_text': body}
+
+
+def edit(rng: random.Random, text: TextSource, body: str) -> str:
+    words = body.split()
+    words[rng.randrange(len(words))] = text.words(1)
+    return ' '.join(words)
+
+
+def main(weeks=8, n_sections=200, republished=0.4, threshold=0.9):
+    rng = random.Random(0)
+    text = TextSource(rng)
+    provider = HashEmbeddingProvider()
+    DataProcessPipeline.embedding_provider = provider
+    DataProcessPipeline.embedding_cache_path = ''
+    DataProcessPipeline.embedding_dedup_path = ':memory:'
+    DataProcessPipeline.embedding_dedup_threshold = threshold
+
+    print(f'{weeks} weeks of {n_sections} sections, {republished:.0%} republished, threshold {threshold}')
+    print(f"{'week':>5} {'embedded':>9} {'reused':>7} {'min cosine':>11} {'seconds':>8}")
+    previous, total_embedded = [], 0
+    for week in range(weeks):
+        sections = []
+        for header, body in rng.sample(previous, int(len(previous) * republished)):
+            body = body if rng.random() < 0.5 else edit(rng, text, body)
+            sections.append((header, body))
+        while len(sections) < n_sections:
+            sections.append((text.header(), text.paragraph(rng.randint(2, 8))))
+        previous = sections
+
+        start = time.perf_counter()
+        index = DataProcessPipeline.get_dedup_index()
+        embedded_before = index.embedded
+        df = DataProcessPipeline.embed_sections([make_section(text, header, body, week) for header, body in sections])
+        seconds = time.perf_counter() - start
+
+        reused = df[df['near_duplicate_of'].notna()]
+        expected = provider.embed(reused['section_text_with_metadata'].tolist())
+        cosines = [sum(a * b for a, b in zip(vector, other))
+                   for vector, other in zip(reused['section_text_with_metadata_embedding'], expected)]
+        embedded = index.embedded - embedded_before
+        total_embedded += embedded
+        print(f'{week:>5} {embedded:>9} {len(reused):>7} {min(cosines, default=1.0):>11.3f} {seconds:>8.2f}')
+    print(f'{total_embedded} of {weeks * n_sections} sections embedded '
+          f'({1 - total_embedded / (weeks * n_sections):.0%} saved)')
+
+
+if __name__ == '__main__':
+    main(*[cast(arg) for cast, arg in zip((int, int, float, float), sys.argv[1:])])
@@ -0,0 +1,53 @@
+"""Pages laid out vs. pages emitted by `BaseConnector` on a local folder of PDFs.
+
+    python -m benchmarks.early_stop_benchmark <pdf_dir>
+
+Compares the streaming connector, which stops laying out pages at the first stop string, with a full
+`extract_pages` pass over the same file.
+"""
+import os
+import sys
+import time
+from pdfminer.high_level import extract_pages
+
+from data_connector.base_connector import BaseConnector
+from utils.pdf_helper.parsed_document import open_document
+
+
+def benchmark_file(fp):
+    start = time.perf_counter()
+    full_pages = sum(1 for _ in extract_pages(fp))
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open_document(fp) as doc:
+        sections = BaseConnector.get_json_all(doc)
+        laid_out = doc.pages_laid_out
+    stream_time = time.perf_counter() - start
+
+    return {'file': os.path.basename(fp), 'pages': full_pages, 'laid_out': laid_out, 'emitted': len(sections),
+            'full_s': full_time, 'stream_s': stream_time}
+
+
+def main(pdf_dir):
+    files = sorted(os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.lower().endswith('.pdf'))
+    print(f"{'file':40} {'pages':>6} {'laid out':>9} {'emitted':>8} {'full s':>8} {'stream s':>9}")
+    results = []
+    for fp in files:
+        res = benchmark_file(fp)
+        results.append(res)
+        print(f"{res['file'][:40]:40} {res['pages']:>6} {res['laid_out']:>9} {res['emitted']:>8} "
+              f"{res['full_s']:>8.2f} {res['stream_s']:>9.2f}")
+
+    if results:
+        pages = sum(r['pages'] for r in results)
+        laid_out = sum(r['laid_out'] for r in results)
+        full_time = sum(r['full_s'] for r in results)
+        stream_time = sum(r['stream_s'] for r in results)
+        print(f'{len(results)} files: {laid_out}/{pages} pages laid out ({1 - laid_out / pages:.0%} skipped), '
+              f'{full_time:.2f}s -> {stream_time:.2f}s')
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
@@ -0,0 +1,59 @@
+"""Throughput of the embedding stage against the local stand-in endpoint, sync and async at several concurrencies.
+
+    python -m benchmarks.embedding_benchmark [texts] [latency_ms] [error_rate]
+
+Starts `benchmarks.embedding_server` in the background (default 2000 texts, 200 ms latency, no
+429s) and runs `DataProcessPipeline.request_embeddings` through the Azure client against it, with
+the client-side rate limiter opened up. The local hash provider is timed as a baseline. No
+credentials or network access are needed.
+"""
+import random
+import sys
+import time
+
+from benchmarks.embedding_server import start_server
+from benchmarks.synthetic_corpus import TextSource
+from pipelines.data_load_pipeline import DataProcessPipeline
+from utils.embedding_helper.provider_helper import AzureOpenAIProvider, HashEmbeddingProvider
+from utils.embedding_helper.rate_limit_helper import RateLimiter, CircuitBreaker
+
+
+def run(texts, provider, embedding_async=False, concurrency=1) -> tuple:
+    DataProcessPipeline.embedding_provider = provider
+    DataProcessPipeline.embedding_async = embedding_async
+    DataProcessPipeline.embedding_concurrency = concurrency
+    DataProcessPipeline.rate_limiter = RateLimiter(rpm=10 ** 6, tpm=10 ** 9)
+    DataProcessPipeline.circuit_breaker = CircuitBreaker()
+    start = time.perf_counter()
+    embeddings = DataProcessPipeline.request_embeddings(texts)
+    return embeddings, time.perf_counter() - start
+
+
+def main(n_texts=2000, latency_ms=200.0, error_rate=0.0):
+    text = TextSource(random.Random(0))
+    texts = [text.paragraph() for _ in range(n_texts)]
+    server = start_server(latency_ms=latency_ms, max_batch=DataProcessPipeline.embedding_batch_size,
+                          error_rate=error_rate)
+    endpoint = f'http://127.0.0.1:{server.server_port}'
+    print(f'{n_texts} texts, {latency_ms:.0f} ms latency, {error_rate:.0%} 429s, '
+          f'batches of {DataProcessPipeline.embedding_batch_size}')
+    print(f"{'mode':>16} {'seconds':>8} {'texts/s':>9} {'failed':>7} {'requests':>9} {'429s':>6}")
+
+    expected, seconds = run(texts, HashEmbeddingProvider(server.dimension))
+    print(f"{'local':>16} {seconds:>8.2f} {n_texts / seconds:>9.0f} {0:>7} {'-':>9} {'-':>6}")
+    for embedding_async, concurrency in ((False, 1), (True, 4), (True, 16), (True, 64)):
+        server.stats.clear()
+        provider = AzureOpenAIProvider('local', DataProcessPipeline.api_version, endpoint, 'local')
+        embeddings, seconds = run(texts, provider, embedding_async, concurrency)
+        failed = sum(embedding is None for embedding in embeddings)
+        mode = f'async x{concurrency}' if embedding_async else 'sync'
+        print(f"{mode:>16} {seconds:>8.2f} {n_texts / seconds:>9.0f} {failed:>7} "
+              f"{server.stats[200] + server.stats[429]:>9} {server.stats[429]:>6}")
+        # the stand-in sends float32 vectors
+        assert all(embedding is None or max(abs(a - b) for a, b in zip(embedding, vector)) < 1e-6
+                   for embedding, vector in zip(embeddings, expected))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(*[cast(arg) for cast, arg in zip((int, float, float), sys.argv[1:])])
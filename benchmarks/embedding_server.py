@@ -0,0 +1,140 @@
+"""Local stand-in for the Azure OpenAI embeddings endpoint, to load-test the embedding stage offline.
+
+    python -m benchmarks.embedding_server [--port 8800] [--latency-ms 200] [--latency-ms-per-text 2]
+                                          [--max-batch 16] [--error-rate 0.05] [--rpm 0] [--dimension 1536]
+
+Then point the pipeline at it:
+
+    OPENAI_ENDPOINT=http://127.0.0.1:8800 OPENAI_API_KEY=local EMBEDDING_MODEL=local ...
+
+Any POST to a path ending in `/embeddings` answers like Azure: vectors are the deterministic
+hash-based vectors of `HashEmbeddingProvider`, in float lists or base64 as requested. Each request
+waits `latency-ms` plus `latency-ms-per-text` per input. Batches larger than `max-batch` get a 400.
+A random `error-rate` share of requests gets a 429, as do the requests over `rpm` per minute; the
+429s carry `retry-after` headers. Request counts are printed on exit.
+"""
+import argparse
+import base64
+import json
+import random
+import struct
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.embedding_helper.provider_helper import get_hash_embedding
+
+
+class EmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency_ms=200.0, latency_ms_per_text=2.0, max_batch=16, error_rate=0.0, rpm=0,
+                 dimension=1536, seed=0):
+        super().__init__(address, EmbeddingHandler)
+        self.latency_ms = latency_ms
+        self.latency_ms_per_text = latency_ms_per_text
+        self.max_batch = max_batch
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.dimension = dimension
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_times = deque()
+        self.stats = Counter()
+
+    def check_rate(self):
+        """Seconds to wait if this request is over the rate limit or drawn for a 429, else None."""
+        now = time.monotonic()
+        with self.lock:
+            if self.rng.random() < self.error_rate:
+                return 1.0
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+            if self.rpm and len(self.request_times) >= self.rpm:
+                return 60 - (now - self.request_times[0])
+            self.request_times.append(now)
+        return None
+
+
+class EmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status: int, code: str, message: str, headers: dict = None):
+        with self.server.lock:
+            self.server.stats[status] += 1
+        self.send_json(status, {'error': {'code': code, 'message': message}}, headers)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.split('?')[0].endswith('/embeddings'):
+            return self.send_error_json(404, 'NotFound', f'No route for {self.path}')
+        texts = body.get('input', [])
+        texts = [texts] if isinstance(texts, str) else [str(text) for text in texts]
+
+        server = self.server
+        wait = server.check_rate()
+        if wait is not None:
+            return self.send_error_json(429, '429', 'Requests to the embeddings operation have exceeded the rate limit.',
+                                        {'retry-after': str(max(round(wait), 1)), 'retry-after-ms': str(int(wait * 1000))})
+        if len(texts) > server.max_batch:
+            return self.send_error_json(400, 'invalid_request_error',
+                                        f'Too many inputs. The max number of inputs is {server.max_batch}.')
+        time.sleep((server.latency_ms + server.latency_ms_per_text * len(texts)) / 1000)
+
+        data = []
+        for index, text in enumerate(texts):
+            embedding = get_hash_embedding(text, server.dimension)
+            if body.get('encoding_format') == 'base64':
+                embedding = base64.b64encode(struct.pack(f'<{len(embedding)}f', *embedding)).decode()
+            data.append({'object': 'embedding', 'index': index, 'embedding': embedding})
+        tokens = sum(len(text) // 4 + 1 for text in texts)
+        with server.lock:
+            server.stats[200] += 1
+            server.stats['texts'] += len(texts)
+        self.send_json(200, {'object': 'list', 'data': data, 'model': body.get('model', ''),
+                             'usage': {'prompt_tokens': tokens, 'total_tokens': tokens}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, **kwargs) -> EmbeddingServer:
+    """Serve in a background thread; with port 0 a free port is picked, see `server.server_port`."""
+    server = EmbeddingServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency-ms', type=float, default=200.0)
+    parser.add_argument('--latency-ms-per-text', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=16)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rpm', type=int, default=0)
+    parser.add_argument('--dimension', type=int, default=1536)
+    args = vars(parser.parse_args())
+    server = EmbeddingServer(('127.0.0.1', args.pop('port')), **args)
+    print(f'Serving embeddings on http://127.0.0.1:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f'Requests by status: {dict(server.stats)}')
+
+
+if __name__ == '__main__':
+    main()
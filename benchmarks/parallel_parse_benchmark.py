@@ -0,0 +1,33 @@
+"""Scaling of `DataProcessPipeline.get_json` with the number of worker processes.
+
+    python -m benchmarks.parallel_parse_benchmark <pdf_dir> [parser] [workers ...]
+
+Parses every PDF of the folder once per worker count (default 1 2 4 8 16) and reports wall time,
+files/s and the speed-up over a single process.
+"""
+import os
+import sys
+import time
+
+from pipelines.data_load_pipeline import DataProcessPipeline
+
+
+def main(pdf_dir, parser='base', worker_counts=(1, 2, 4, 8, 16), chunksize=4):
+    fp_list = sorted(os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.lower().endswith('.pdf'))
+    print(f'{len(fp_list)} files, {parser} connector, {os.cpu_count()} cpus')
+    print(f"{'workers':>8} {'wall s':>8} {'files/s':>8} {'speed-up':>9} {'sections':>9} {'failed':>7}")
+
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        json_list, failed = DataProcessPipeline.get_json(fp_list, parser, workers=workers, chunksize=chunksize)
+        wall = time.perf_counter() - start
+        results.append({'workers': workers, 'wall_s': wall, 'sections': len(json_list), 'failed': len(failed)})
+        speed_up = results[0]['wall_s'] / wall
+        print(f'{workers:>8} {wall:>8.2f} {len(fp_list) / wall:>8.2f} {speed_up:>9.2f} {len(json_list):>9} {len(failed):>7}')
+    return results
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(args[0], *args[1:2], *([tuple(int(n) for n in args[2:])] if len(args) > 2 else []))
@@ -0,0 +1,93 @@
+"""Minimal PDF writer for synthetic documents: text in the standard Helvetica fonts, rules and rectangles.
+
+Only what the layout cues of the connectors need is supported, so that generating a corpus needs
+nothing beyond the standard library.
+"""
+import zlib
+
+FONTS = {False: ('F1', 'Helvetica'), True: ('F2', 'Helvetica-Bold')}
+
+
+def escape(text: str) -> bytes:
+    data = text.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def color_op(color, stroke=False) -> str:
+    """Colour operator: a number is a gray level, 3 components are RGB and 4 are CMYK."""
+    if isinstance(color, (int, float)):
+        return f'{color} {"G" if stroke else "g"}'
+    op = {3: 'rg', 4: 'k'}[len(color)]
+    return f'{" ".join(str(c) for c in color)} {op.upper() if stroke else op}'
+
+
+class Canvas:
+    """Drawing operations of one page, in PDF user space (origin at the bottom left, in points)."""
+
+    def __init__(self, width: float = 595, height: float = 842):
+        self.width = width
+        self.height = height
+        self.ops = []
+
+    def text(self, x, y, text, size=9, bold=False, color=0):
+        font, _ = FONTS[bold]
+        self.ops.append(f'BT /{font} {size} Tf {color_op(color)} {x:.2f} {y:.2f} Td ('.encode()
+                        + escape(text) + b') Tj ET')
+
+    def lines(self, x, y, lines, size=9, leading=None, **kwargs) -> float:
+        """Draw lines of text downwards from `y` and return the y below the last one."""
+        leading = leading or size * 1.2
+        for line in lines:
+            self.text(x, y, line, size, **kwargs)
+            y -= leading
+        return y
+
+    def line(self, x0, y0, x1, y1, width=0.5, color=0):
+        self.ops.append(f'{width} w {color_op(color, stroke=True)} {x0:.2f} {y0:.2f} m {x1:.2f} {y1:.2f} l S'.encode())
+
+    def rect(self, x, y, width, height, fill=None, stroke=0):
+        op = 'S' if fill is None else 'B'
+        fill_op = '' if fill is None else color_op(fill) + ' '
+        self.ops.append(f'{fill_op}{color_op(stroke, stroke=True)} {x:.2f} {y:.2f} {width:.2f} {height:.2f} re {op}'.encode())
+
+    def get_content(self) -> bytes:
+        return b'\n'.join(self.ops)
+
+
+def write_pdf(path: str, pages: list[Canvas], creation_date: str = None, compress: bool = True):
+    """Write the pages as a PDF; `creation_date` is a PDF date string, e.g. `D:20230313080000+01'00'`."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b'')
+    page_tree = add(b'')
+    fonts = {name: add(f'<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>'.encode())
+             for name, base in FONTS.values()}
+    font_dict = ' '.join(f'/{name} {obj} 0 R' for name, obj in fonts.items())
+    page_ids = []
+    for page in pages:
+        content = zlib.compress(page.get_content()) if compress else page.get_content()
+        stream_filter = ' /Filter /FlateDecode' if compress else ''
+        content_id = add(f'<< /Length {len(content)}{stream_filter} >>\nstream\n'.encode() + content + b'\nendstream')
+        page_ids.append(add(f'<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 {page.width} {page.height}] '
+                            f'/Resources << /Font << {font_dict} >> >> /Contents {content_id} 0 R >>'.encode()))
+    objects[catalog - 1] = f'<< /Type /Catalog /Pages {page_tree} 0 R >>'.encode()
+    objects[page_tree - 1] = (f'<< /Type /Pages /Count {len(page_ids)} /Kids ['
+                              + ' '.join(f'{i} 0 R' for i in page_ids) + '] >>').encode()
+    info = add(b'<< /Producer (lpds synthetic corpus)' + (b' /CreationDate (' + escape(creation_date) + b')'
+                                                          if creation_date else b'') + b' >>')
+
+    data = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f'{i} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(data)
+    data += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    data += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    data += f'trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as file:
+        file.write(data)
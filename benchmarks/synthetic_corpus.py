@@ -0,0 +1,337 @@
+"""Synthetic PDF corpus reproducing the layout cues each connector relies on, for benchmarks and load tests.
+
+    python -m benchmarks.synthetic_corpus <output_dir> [documents] [pages] [series ...]
+
+Writes `documents` PDFs (default 10) per series into `<output_dir>/<series>/`, the layout expected by
+`benchmarks.connector_benchmark`. `pages` (default 4) scales the body of each document: story pages
+of a Research Weekly, pages per Wire section, content pages of a CIO Monthly, equity pages of an
+Equity Top Picks. Text is random words; generation is seeded, so a corpus can be rebuilt identically.
+
+Reproduced cues: the dated cover, page number box and `STORIES OF THE WEEK` two-column pages of the
+Research Weekly; the 12pt section titles and upper-case story headers of the Wire; the RGB headers,
+`Chart` / `Source:` notes, boxed summary and asset allocation closing page of the CIO Monthly; the
+key information tables drawn with rules and the deletion tables of the Equity Top Picks.
+"""
+import os
+import random
+import sys
+import textwrap
+from datetime import date, timedelta
+
+from benchmarks.pdf_writer import Canvas, write_pdf
+from settings import JB_LEGAL_DISCLAIMER
+
+WORDS = ('market', 'growth', 'inflation', 'rates', 'earnings', 'equities', 'bonds', 'outlook', 'central', 'bank',
+         'policy', 'investors', 'demand', 'supply', 'energy', 'technology', 'consumer', 'credit', 'yield', 'spread',
+         'currency', 'dollar', 'emerging', 'recovery', 'valuation', 'margin', 'quarter', 'guidance', 'revenue',
+         'sector', 'portfolio', 'allocation', 'risk', 'volatility', 'momentum', 'dividend', 'cycle', 'labour', 'wage',
+         'housing', 'trade', 'tariff', 'commodity', 'oil', 'gold', 'china', 'europe', 'japan', 'sentiment', 'signal')
+COMPANIES = ('ACME HOLDINGS', 'NORDIC SYSTEMS', 'ALPINE FOODS', 'PACIFIC LOGISTICS', 'HELVETIA MEDICAL', 'ORION ENERGY',
+             'ZENITH SEMICONDUCTORS', 'LUMEN PHARMA', 'ATLAS INDUSTRIALS', 'MERIDIAN INSURANCE', 'VEGA SOFTWARE')
+SECTORS = ('Information Technology', 'Health Care', 'Industrials', 'Financials', 'Energy', 'Materials', 'Utilities')
+COUNTRIES = ('Switzerland', 'United States', 'Germany', 'Japan', 'France', 'Netherlands', 'Sweden')
+RGB_HEADER = (0.222, 0.178, 0.509)
+PAGE_TOP = 800
+LEGAL_TITLE = 'IMPORTANT LEGAL INFORMATION'
+
+
+class TextSource:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def words(self, n: int) -> str:
+        return ' '.join(self.rng.choice(WORDS) for _ in range(n))
+
+    def sentence(self) -> str:
+        return self.words(self.rng.randint(8, 16)).capitalize() + '.'
+
+    def paragraph(self, n_sentences: int = None) -> str:
+        return ' '.join(self.sentence() for _ in range(n_sentences or self.rng.randint(3, 6)))
+
+    def lines(self, width: int, n_sentences: int = None) -> list[str]:
+        """A paragraph wrapped to `width` characters per line."""
+        return textwrap.wrap(self.paragraph(n_sentences), width)
+
+    def header(self) -> str:
+        return self.words(self.rng.randint(3, 5)).upper()
+
+
+def pdf_date(day: date) -> str:
+    return f"D:{day:%Y%m%d}080000+01'00'"
+
+
+def add_page_numbers(pages: list[Canvas], x=40, y=PAGE_TOP - 15):
+    """The `page / total` box that the connectors read as the second element of a page."""
+    for number, page in enumerate(pages, start=1):
+        page.text(x, y, f'{number} / {len(pages)}', 8)
+
+
+def add_legal_page(pages: list[Canvas], text: TextSource):
+    page = Canvas()
+    page.text(40, PAGE_TOP, LEGAL_TITLE, 12, bold=True)
+    y = PAGE_TOP - 40
+    for _ in range(6):
+        y = page.lines(40, y, text.lines(110), 7) - 10
+    pages.append(page)
+
+
+def make_base(rng, day, n_pages) -> list[Canvas]:
+    text = TextSource(rng)
+    pages = []
+    for _ in range(n_pages):
+        page = Canvas()
+        page.text(40, PAGE_TOP, 'MARKET COMMENTARY', 8)
+        y = PAGE_TOP - 50
+        while y > 160:
+            y = page.lines(40, y, text.lines(95), 9) - 14
+        page.text(40, 40, JB_LEGAL_DISCLAIMER, 7)
+        pages.append(page)
+    add_legal_page(pages, text)
+    add_page_numbers(pages)
+    return pages
+
+
+def make_rw(rng, day, n_pages) -> list[Canvas]:
+    text = TextSource(rng)
+    dated = f"{day:%A}, {day.day} {day:%B %Y}; 17:00 CET".upper()
+    cover = Canvas()
+    cover.text(40, PAGE_TOP, dated, 8)
+    cover.text(40, 740, 'RESEARCH WEEKLY', 24, bold=True)
+    y = cover.lines(40, 690, ['CONTENT'] + [text.words(4).capitalize() for _ in range(5)], 10) - 20
+    y = cover.lines(40, y, ['EDITORIAL'] + text.lines(95, 8), 9) - 20
+    cover.lines(40, y, ['KEY DATES'] + [f'{day + timedelta(days=i):%d.%m}  {text.words(5)}' for i in range(1, 6)], 9)
+    cover.text(40, 40, JB_LEGAL_DISCLAIMER, 7)
+    pages = [cover]
+
+    for i in range(n_pages):
+        page = Canvas()
+        page.text(40, PAGE_TOP, 'RESEARCH WEEKLY', 8)
+        top = 740
+        if i == 0:
+            page.text(40, 750, 'STORIES OF THE WEEK', 14, bold=True)
+            top = 700
+        for x in (40, 310):
+            y = page.lines(x, top, [text.header()] + text.lines(48), 9) - 14
+            while y > 160:
+                y = page.lines(x, y, text.lines(48), 9) - 14
+        pages.append(page)
+
+    for i in range(max(1, n_pages // 2)):
+        page = Canvas()
+        page.text(40, PAGE_TOP, 'RESEARCH WEEKLY', 8)
+        y = 700
+        if i == 0:
+            page.text(40, 750, 'INVESTMENT IDEAS', 14, bold=True)
+        while y > 200:
+            y = page.lines(40, y, [text.header()] + text.lines(100, 6), 9) - 18
+        pages.append(page)
+
+    page = Canvas()
+    page.text(40, PAGE_TOP, 'RESEARCH WEEKLY', 8)
+    page.text(40, 750, 'NEXT GENERATION', 14, bold=True)
+    page.lines(40, 700, text.lines(100, 8), 9)
+    pages.append(page)
+
+    page = Canvas()
+    page.text(40, PAGE_TOP, 'RESEARCH WEEKLY', 8)
+    page.text(40, 750, 'THE BIG PICTURE', 14, bold=True)
+    page.text(40, 710, 'THE ECONOMY', 10, bold=True)
+    page.text(310, 710, 'CAPITAL MARKETS', 10, bold=True)
+    for x in (40, 310):
+        y = 690
+        while y > 500:
+            y = page.lines(x, y, text.lines(48, 3), 9) - 14
+    page.text(40, 380, 'ECONOMIC BASELINE SCENARIO', 10, bold=True)
+    page.lines(40, 355, text.lines(100, 6), 9)
+    pages.append(page)
+
+    add_legal_page(pages, text)
+    add_page_numbers(pages)
+    return pages
+
+
+def make_wire_section(text, title, n_pages, first_page: Canvas = None, top=700) -> list[Canvas]:
+    """A Wire section: its 12pt title, then upper-case story headers and story text in the left column."""
+    pages = []
+    page = first_page or Canvas()
+    y = top
+    page.text(40, y, title, 12, bold=True)
+    y -= 30
+    for _ in range(n_pages):
+        if page is None:
+            page, y = Canvas(), 740
+        while y > 140:
+            y = page.lines(40, y, [text.header()], 9, bold=True) - 8
+            y = page.lines(40, y, text.lines(70), 9) - 14
+        pages.append(page)
+        page = None
+    return pages
+
+
+def rng_figure(rng) -> str:
+    return f'{rng.uniform(-5, 5):+.1f}%'
+
+
+def add_closing_page(pages, title, text):
+    page = Canvas()
+    page.text(40, 740, title, 12, bold=True)
+    y = 700
+    for _ in range(12):
+        page.line(40, y + 12, 550, y + 12)
+        page.text(40, y, text.words(3), 8)
+        page.text(300, y, rng_figure(text.rng), 8)
+        y -= 20
+    pages.append(page)
+
+
+def make_wire(rng, day, n_pages) -> list[Canvas]:
+    text = TextSource(rng)
+    cover = Canvas()
+    cover.text(40, PAGE_TOP, f'THE WIRE, {day.day} {day:%B %Y}; 08:00 CET', 8)
+    cover.text(40, 750, 'MARKET UPDATE', 12, bold=True)
+    y = cover.lines(40, 725, text.lines(70, 4), 9) - 14
+    y = cover.lines(40, y, text.lines(70, 3), 9) - 24
+    pages = make_wire_section(text, 'TOP STORIES', n_pages, cover, top=y)
+    for title, closing in (('ECONOMIES & MARKETS', 'ECONOMIC FORECASTS'), ('COMPANY NEWS', 'TECHNICAL RECOMMENDATIONS')):
+        if title == 'ECONOMIES & MARKETS':
+            add_closing_page(pages, 'MARKET REVIEW & FORECASTS', text)
+        pages += make_wire_section(text, title, n_pages)
+        add_closing_page(pages, closing, text)
+    for page in pages[1:]:
+        page.text(40, PAGE_TOP, 'THE WIRE', 8)
+    add_legal_page(pages, text)
+    add_page_numbers(pages)
+    return pages
+
+
+def make_ciomonthly(rng, day, n_pages) -> list[Canvas]:
+    text = TextSource(rng)
+    name = text.words(3).title()
+    cover = Canvas()
+    cover.text(40, PAGE_TOP, 'CIO MONTHLY', 10, bold=True)
+    cover.rect(35, 560, 200, 170, fill=0.9)
+    cover.lines(40, 715, ['In brief'] + text.lines(40, 5), 9)
+    y = 540
+    while y > 160:
+        y = cover.lines(40, y, text.lines(40, 3), 9, color=(0, 0, 0)) - 14
+    y = 715
+    while y > 160:
+        y = cover.lines(300, y, text.lines(48, 3), 9, color=(0, 0, 0)) - 14
+    cover.text(40, 40, JB_LEGAL_DISCLAIMER, 7)
+    pages = [cover]
+
+    for i in range(n_pages + 1):
+        page = Canvas()
+        if i != 1:
+            page.text(40, PAGE_TOP, 'CIO MONTHLY', 8)
+        else:
+            page.text(40, 770, name, 14, bold=True)
+            page.text(40, 740, f'{day.day} {day:%B %Y}', 9)
+        for x, width in ((40, 40), (300, 48)):
+            y = 700
+            while y > 160:
+                if text.rng.random() < 0.35:
+                    y = page.lines(x, y, [text.header().title()], 10, bold=True, color=RGB_HEADER)
+                    y = page.lines(x, y, text.lines(width, 3), 9) - 14
+                elif text.rng.random() < 0.15:
+                    y = page.lines(x, y, [f'Chart {i + 1}: {text.words(4)}'], 9, bold=True) - 60
+                    y = page.lines(x, y, [f'Source: {text.words(2).title()}, Julius Baer'], 7) - 14
+                else:
+                    y = page.lines(x, y, text.lines(width, 3), 9) - 14
+        page.text(40, 40, f'Julius Baer CIO Monthly | {day:%B %Y}', 7)
+        pages.append(page)
+
+    page = Canvas()
+    page.text(40, PAGE_TOP, 'CIO MONTHLY', 8)
+    page.lines(40, 700, ['Current asset allocation'], 12, bold=True, color=RGB_HEADER)
+    y = 660
+    for _ in range(10):
+        page.line(40, y + 12, 550, y + 12)
+        page.text(40, y, text.words(2).title(), 9)
+        page.text(300, y, f'{text.rng.randint(0, 40)}%', 9)
+        y -= 20
+    pages.append(page)
+    add_legal_page(pages, text)
+    add_page_numbers(pages, y=30)
+    return pages
+
+
+def make_equity_page(text, company) -> Canvas:
+    rng = text.rng
+    page = Canvas()
+    page.text(40, 810, company, 14, bold=True)
+    page.text(40, 785, f'{company.title()}: {text.words(4)}', 10)
+    for y in (770, 750, 730):
+        page.line(40, y, 550, y)
+    page.text(40, 756, company.title(), 9, bold=True)
+    page.text(300, 756, rng.choice(COUNTRIES), 9)
+    page.text(40, 736, rng.choice(SECTORS), 9)
+    page.text(220, 736, f"Rating: {rng.choice(('Buy', 'Hold'))}", 9)
+    page.text(420, 736, f'Risk rating: {rng.randint(1, 5)}', 9)
+    for y, label, value in ((712, 'ISIN', f'CH{rng.randint(10 ** 9, 10 ** 10 - 1)}'),
+                            (696, 'Bloomberg Ticker', f'{company.split()[0][:4]} SW'),
+                            (680, 'Currency', rng.choice(('CHF', 'USD', 'EUR')))):
+        page.text(40, y, label, 8)
+        page.text(200, y, value, 8)
+    y = page.lines(40, 640, ['Company Description'], 10, bold=True) - 6
+    y = page.lines(40, y, text.lines(40, 4), 9) - 14
+    y = page.lines(40, y, ['Investment Rationale'], 10, bold=True) - 6
+    while y > 160:
+        y = page.lines(40, y, text.lines(40, 3), 9) - 14
+    page.lines(300, 640, ['Performance'] + [f'{year}  {rng_figure(rng)}' for year in range(2019, 2024)], 9)
+    page.text(40, 40, 'Please find important legal information at the end of this document.', 7)
+    return page
+
+
+def make_equitytoppicks(rng, day, n_pages) -> list[Canvas]:
+    text = TextSource(rng)
+    cover = Canvas()
+    cover.text(40, 810, 'EQUITY TOP PICKS', 20, bold=True)
+    cover.text(40, 770, f'Monthly selection, {day.day} {day:%B %Y}', 10)
+    y = 720
+    while y > 160:
+        y = cover.lines(40, y, text.lines(95, 3), 9) - 14
+    pages = [cover]
+    companies = rng.sample(COMPANIES, min(n_pages, len(COMPANIES)))
+    companies += [f'{rng.choice(COMPANIES)} {i}' for i in range(n_pages - len(companies))]
+    pages += [make_equity_page(text, company) for company in companies]
+
+    page = Canvas()
+    page.text(40, 810, 'EQUITY TOP PICKS - DELETIONS', 14, bold=True)
+    for y in (780, 100, 80):
+        page.line(40, y, 550, y)
+    page.line(40, 762, 550, 762)
+    for x, label in zip((40, 150, 260, 370, 460), ('Equity', 'Added', 'Removed', 'Return', 'Reason')):
+        page.text(x, 768, label, 8, bold=True)
+    y = 740
+    for region in ('Europe', 'Americas', 'Asia'):
+        page.text(40, y, region, 9, bold=True)
+        y -= 18
+        for _ in range(rng.randint(2, 6)):
+            added = day - timedelta(days=rng.randint(60, 400))
+            cells = (rng.choice(COMPANIES).title(), f'{added:%d.%m.%Y}', f'{day:%d.%m.%Y}', rng_figure(rng), 'Target reached')
+            for x, cell in zip((40, 150, 260, 370, 460), cells):
+                page.text(x, y, cell, 8)
+            y -= 18
+    pages.append(page)
+    add_legal_page(pages, text)
+    return pages
+
+
+GENERATORS = {'base': make_base, 'rw': make_rw, 'wire': make_wire, 'ciomonthly': make_ciomonthly,
+              'equitytoppicks': make_equitytoppicks}
+
+
+def main(output_dir, documents=10, pages=4, series=None, seed=0):
+    for name in series or GENERATORS:
+        folder = os.path.join(output_dir, name)
+        os.makedirs(folder, exist_ok=True)
+        for i in range(documents):
+            rng = random.Random(f'{seed}-{name}-{i}')
+            day = date(2023, 1, 2) + timedelta(days=rng.randint(0, 700))
+            write_pdf(os.path.join(folder, f'{name}-{i:05d}.pdf'), GENERATORS[name](rng, day, pages), pdf_date(day))
+        print(f'{documents} {name} documents written to {folder}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:4]], *([sys.argv[4:]] if len(sys.argv) > 4 else []))
@@ -0,0 +1,164 @@
+"""Vectorised `table_extractor` and row grouping against the previous per-row scans.
+
+    python -m benchmarks.table_extractor_benchmark [pdf_dir] [repeat]
+
+Builds synthetic table pages shaped like the `EquitySwitchConnector` comparison tables (ruled rows,
+a label and two value columns, some rows missing a cell) and the `EquityTopPicksConnector` deletion
+tables (five columns, rows grouped by y0, region rows in between), at growing sizes. With a
+`pdf_dir`, the comparison page of every Equity Switch document and the deletion pages of every
+Equity Top Picks document are added. Checks that the outputs are identical, then times both.
+"""
+import os
+import random
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pdfminer.layout import LTAnno, LTLine, LTTextBoxHorizontal, LTTextLineHorizontal
+
+from data_connector.equitytoppicks_connector import EquityTopPicksConnector
+from utils.pdf_helper.parsed_document import open_document
+from utils.pdf_helper.text_helper import clean_text
+from utils.table_extractor import get_n_th_line_height, group_rows_by_y0, table_extractor
+
+
+def reference_table_extractor(page, ymin, ymax, xmin = -1, xmax =10000, row_lines = True, has_header = False):
+    elements = [el for el in page if (el.y0 > ymin and el.y0 < ymax and el.x0 >-1 and el.x0 < 1000 and isinstance(el, LTTextBoxHorizontal))]
+    table, cnt = [], []
+    table_formatted = []
+    if row_lines:
+        row_lim = np.unique([el.y0 for el in page if (el.y0 > ymin and el.y0 < ymax and isinstance(el, LTLine))])
+    else:
+        row_lim = np.unique([el.y0 for el in elements])
+    row_lim = [ymax] + list(- np.sort(-np.array(row_lim))) + [ymin]
+    for i in range(len(row_lim)-1):
+        ymin_row, ymax_row = row_lim[i+1], row_lim[i]
+        row = [el for el in elements if (el.y0 > ymin_row and el.y0 <ymax_row)]
+        cnt.append(len(row))
+        table.append(row)
+    n_cols = np.bincount(cnt).argmax()
+    col_lim = np.zeros(n_cols)
+    for i in range(n_cols):
+        col_lim[i] = max([row[i].x1 for row in table if (len(row)==n_cols)])
+    col_lim = [xmin] + list(col_lim)
+    col_lim[-1] = xmax
+    for row in table:
+        if len(row) == n_cols:
+            table_formatted.append([clean_text(el.get_text()) for el in row])
+        else:
+            row_good_format = []
+            for i in range(len(col_lim)-1):
+                xmin_col, xmax_col = col_lim[i], col_lim[i+1]
+                col_element = clean_text([el.get_text() for el in row if el.x1 > xmin_col and el.x1 <= xmax_col])
+                row_good_format.append(col_element)
+            table_formatted.append(row_good_format)
+    table_formatted = np.array(table_formatted)
+    if (table_formatted[0,:]=="").all():
+        table_formatted = table_formatted[1:, :]
+    if has_header:
+        return pd.DataFrame(data = table_formatted[1:,1:], columns = table_formatted[0,1:], index = table_formatted[1:, 0])
+    return pd.DataFrame(data = table_formatted[:,1:], index = table_formatted[:,0])
+
+
+def reference_group_rows_by_y0(elements):
+    return [[el for el in elements if el.y0==y0] for y0 in -np.sort(-np.unique([el.y0 for el in elements]))]
+
+
+def make_box(x0, y0, x1, text) -> LTTextBoxHorizontal:
+    line = LTTextLineHorizontal(0.1)
+    line.set_bbox((x0, y0, x1, y0 + 8))
+    # a single annotation carries the text, no character geometry is needed here
+    line._objs.append(LTAnno(text + '\n'))
+    box = LTTextBoxHorizontal()
+    box.add(line)
+    return box
+
+
+def make_comparison_page(n_rows, rng) -> tuple:
+    page, y = [], 50.0 + 20 * n_rows
+    ymax = y + 20
+    page.append(LTLine(0.5, (20, ymax), (560, ymax)))
+    for i in range(n_rows):
+        page.append(LTLine(0.5, (20, y), (560, y)))
+        page.append(make_box(20, y + 5, 20 + rng.uniform(60, 180), f'Metric {i}'))
+        for col, x0 in enumerate((300, 450)):
+            if rng.random() > 0.1:
+                page.append(make_box(x0, y + 5 + rng.choice((0, 0.5)), x0 + rng.uniform(40, 90), f'{rng.uniform(-50, 50):.1f}%'))
+        y -= 20
+    page.append(LTLine(0.5, (20, y), (560, y)))
+    rng.shuffle(page)
+    return page, y, ymax
+
+
+def make_deletion_elements(n_rows, rng) -> list:
+    elements = []
+    for i in range(n_rows):
+        y0 = 700.0 - 12 * i
+        if i % 20 == 0:
+            elements.append(make_box(20, y0, 120, f'Region {i // 20}'))
+            continue
+        for col in range(5):
+            elements.append(make_box(20 + 110 * col, y0, 100 + 110 * col, f'cell {i} {col}'))
+    rng.shuffle(elements)
+    return elements
+
+
+def get_pdf_tables(pdf_dir) -> tuple:
+    comparisons, deletions = [], []
+    for file in sorted(os.listdir(pdf_dir)):
+        if not file.lower().endswith('.pdf'):
+            continue
+        with open_document(os.path.join(pdf_dir, file)) as doc:
+            first_page = doc.pages[0]
+            if any('BUY' in el.get_text() and 'SELL' in el.get_text() for el in first_page if isinstance(el, LTTextBoxHorizontal)):
+                page = doc.pages[1]
+                ymax = [el.y0 for el in page if isinstance(el, LTTextBoxHorizontal) and el.get_text().startswith("COMPARISON")][0]
+                lines = np.unique([el.y0 for el in page if isinstance(el, LTLine) and el.y0 < ymax])
+                comparisons.append((list(page), get_n_th_line_height(page, 0), np.partition(lines, -2)[-2]))
+                continue
+            for page in doc.iter_pages(until=EquityTopPicksConnector.is_last_page):
+                header = EquityTopPicksConnector.get_page_header(page)
+                if isinstance(header, LTTextBoxHorizontal) and header.get_text().startswith("EQUITY TOP PICKS - DELETIONS"):
+                    lines = [el.y0 for el in page if isinstance(el, LTLine)]
+                    first_line_y0, before_last_y0 = np.partition(lines, -2)[-2], np.partition(lines, 1)[1]
+                    deletions.append([el for el in page if (el.y0 > before_last_y0 and el.y0 < first_line_y0
+                                                            and isinstance(el, LTTextBoxHorizontal))])
+    return comparisons, deletions
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def compare(name, reference, vectorised, repeat):
+    expected, ref_time = timed(reference, repeat)
+    result, new_time = timed(vectorised, repeat)
+    assert len(result) == len(expected) and all(
+        r.equals(e) if isinstance(r, pd.DataFrame) else r == e for r, e in zip(result, expected)), f'{name}: outputs differ'
+    print(f'{name:40} reference {ref_time * 1000:9.2f} ms   vectorised {new_time * 1000:9.2f} ms (x{ref_time / new_time:.1f})')
+
+
+def main(pdf_dir=None, repeat=5):
+    rng = random.Random(0)
+    comparisons = {n: [make_comparison_page(n, rng) for _ in range(10)] for n in (10, 100, 1000)}
+    deletions = {n: [make_deletion_elements(n, rng) for _ in range(10)] for n in (10, 100, 1000)}
+    if pdf_dir:
+        comparisons['pdf'], deletions['pdf'] = get_pdf_tables(pdf_dir)
+
+    for n, pages in comparisons.items():
+        if pages:
+            compare(f'comparison tables ({n} rows x {len(pages)})',
+                    lambda: [reference_table_extractor(page, ymin, ymax) for page, ymin, ymax in pages],
+                    lambda: [table_extractor(page, ymin, ymax) for page, ymin, ymax in pages], repeat)
+    for n, pages in deletions.items():
+        if pages:
+            compare(f'deletion tables ({n} rows x {len(pages)})',
+                    lambda: [[[el.get_text() for el in row] for row in reference_group_rows_by_y0(elements)] for elements in pages],
+                    lambda: [[[el.get_text() for el in row] for row in group_rows_by_y0(elements)] for elements in pages], repeat)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2], *[int(arg) for arg in sys.argv[2:3]])
@@ -0,0 +1,122 @@
+"""`clean_text` against the previous multi-pass implementation, on the text blocks of real pages.
+
+    python -m benchmarks.text_normalise_benchmark <pdf_dir> [repeat]
+
+Collects the text of every `LTTextContainer` of every page, checks that the new single-pass
+function gives exactly the same output as the previous one, then times them. The reference is a copy
+of the previous functions, trie-based stop-string search included. No batch variant is timed: a
+batch API over `clean_text` was left out, since pages share nothing beyond the module-level tables
+`clean_text` already reuses.
+"""
+import os
+import sys
+import time
+import unicodedata
+from pdfminer.layout import LTTextContainer
+
+from settings import JB_LEGAL_DISCLAIMER, STOP_STRINGS
+from utils.pdf_helper.parsed_document import open_document
+from utils.pdf_helper.text_helper import clean_text
+
+
+class ReferenceTrie:
+    def __init__(self):
+        self.children = {}
+        self.is_end = False
+
+    def builder(self, str_list):
+        root = ReferenceTrie()
+        for string in str_list:
+            cur_node = root
+            for char in string:
+                if char not in cur_node.children:
+                    cur_node.children[char] = ReferenceTrie()
+                cur_node = cur_node.children[char]
+            cur_node.is_end = True
+        return root
+
+    def retriever(self, query, root):
+        cur_node = root
+        for char in query:
+            if char not in cur_node.children:
+                return False
+            cur_node = cur_node.children[char]
+            if cur_node.is_end:
+                return True
+        return False
+
+
+def reference_get_substr_first_pos(query, str_list):
+    trie = ReferenceTrie()
+    root = trie.builder(str_list)
+    for i in range(len(query)):
+        if trie.retriever(query[i:], root):
+            return i
+    return None
+
+
+def reference_remove_uncommon_utf8(text) -> str:
+    filtered_text = ""
+    for char in text:
+        if unicodedata.category(char)[0] == 'C':
+            continue
+        filtered_text += char
+    return filtered_text
+
+
+def reference_clean_text(text_list, remove_stop_str=False, legal_str=None):
+    text = ''.join(text_list)
+    text = text.replace('-\n', '')
+    text = text.replace('\n', '')
+    text = reference_remove_uncommon_utf8(text)
+    if legal_str:
+        text = text.replace(legal_str, '')
+
+    if not remove_stop_str:
+        return text
+
+    early_stop = False
+    rm_start_pos = reference_get_substr_first_pos(text, STOP_STRINGS)
+    if rm_start_pos is not None:
+        early_stop = True
+        text = text[:rm_start_pos]
+    return text, early_stop
+
+
+def get_page_texts(pdf_dir) -> list[list[str]]:
+    page_texts = []
+    for file in sorted(os.listdir(pdf_dir)):
+        if not file.lower().endswith('.pdf'):
+            continue
+        with open_document(os.path.join(pdf_dir, file)) as doc:
+            for page in doc.iter_pages():
+                page_texts.append([el.get_text() for el in page if isinstance(el, LTTextContainer)])
+    return page_texts
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(pdf_dir, repeat=5):
+    page_texts = get_page_texts(pdf_dir)
+    n_chars = sum(len(text) for texts in page_texts for text in texts)
+    print(f'{len(page_texts)} pages, {n_chars} characters')
+
+    cases = [('clean_text', False, None), ('clean_text stop strings', True, None),
+             ('clean_text legal disclaimer', False, JB_LEGAL_DISCLAIMER)]
+    for name, remove_stop_str, legal_str in cases:
+        expected, ref_time = timed(lambda: [reference_clean_text(texts, remove_stop_str, legal_str)
+                                            for texts in page_texts], repeat)
+        single, single_time = timed(lambda: [clean_text(texts, remove_stop_str, legal_str)
+                                             for texts in page_texts], repeat)
+        assert single == expected, f'{name}: single-pass output differs from the reference'
+        print(f'{name:30} reference {ref_time * 1000:8.2f} ms   single {single_time * 1000:8.2f} ms '
+              f'(x{ref_time / single_time:.1f})')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:3]])
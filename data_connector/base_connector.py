@@ -2,30 +2,49 @@ __author__ = ['Pei Kaiyu', 'Chenlong']
 __version__ = 'v2.0'
 
 
+import sys
 import uuid
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage
+from pdfminer.layout import LTTextContainer
 
-from settings import STOP_STRINGS
-from utils.pdf_helper.text_helper import get_substr_first_pos, is_non_text, remove_hyphenation, concat_lines, remove_uncommon_utf8, clean_text
+from utils.pdf_helper.text_helper import is_non_text, clean_text
 from utils.pdf_helper.doc_helper import get_date_from_meta, get_name_from_path
+from utils.pdf_helper.parsed_document import open_document
+from utils.trace_helper import span
 
 
 class BaseConnector:
+    # zero-indexed pages the connector reads, so that no other page is laid out; None for the whole document
+    page_numbers = None
+
+    @classmethod
+    def get_version(cls) -> str:
+        """`__version__` of the connector module; bump it to have the files it processed ingested again."""
+        return sys.modules[cls.__module__].__version__
+
+    @classmethod
+    def get_json_all(cls, fp, name=None):
+        """Sections of a document given by path, PDF bytes or file object; `name` is the file name of bytes."""
+        with open_document(fp, page_numbers=cls.page_numbers, name=name) as doc, span('connector', connector=cls.__name__):
+            return cls.get_json_from_document(doc)
+
+    @classmethod
+    def get_all_components(cls, fp, name=None):
+        with open_document(fp, page_numbers=cls.page_numbers, name=name) as doc, span('connector', connector=cls.__name__):
+            return cls.get_components_from_document(doc)
+
     @classmethod
-    def get_json_all(cls, fp):
-        pages = list(extract_pages(fp))
-        early_stop = False
+    def get_components_from_document(cls, doc):
+        raise NotImplementedError(f'{cls.__name__} does not extract document components')
+
+    @classmethod
+    def get_json_from_document(cls, doc):
         json_list = []
 
-        pub_date = get_date_from_meta(fp)
-        src_doc = get_name_from_path(fp)
+        pub_date = get_date_from_meta(doc)
+        src_doc = get_name_from_path(doc)
         doc_name = src_doc.split('.')[0]
 
-        for page in pages:
-            if early_stop:
-                return json_list
-
+        for page in doc.iter_pages():
             # start_page = page.pageid
             # end_page = start_page
             # page_num = cls.get_page_num(start_page, end_page)
@@ -42,6 +61,10 @@ class BaseConnector:
 
             sec_json = cls.format_section(pub_date=pub_date, src_doc=src_doc, pg_num=page_num, doc_name=doc_name, sec_text=sec_text)
             json_list.append(sec_json)
+
+            # stop before the next page is laid out: everything after the stop string is legal text
+            if early_stop:
+                break
         return json_list
 
     @classmethod
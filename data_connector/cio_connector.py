@@ -2,12 +2,10 @@ __author__ = ['Pei Kaiyu', 'Chenlong']
 __version__ = 'v2.0'
 
 
-import os
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal
+from pdfminer.layout import LTTextContainer, LTTextBoxHorizontal
 from data_connector.base_connector import BaseConnector
 from utils.pdf_helper.doc_helper import get_date_from_name, get_name_from_cover
-from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_char_colors, remove_hyphenation, concat_lines, remove_uncommon_utf8, clean_text
+from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_char_colors, concat_lines, clean_text
 
 
 class CIOConnector(BaseConnector):
@@ -17,11 +15,11 @@ class CIOConnector(BaseConnector):
     page_start = 2
     
     @classmethod
-    def get_json_all(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_json_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
 
-        pub_date = get_date_from_name(os.path.basename(fp), cls.doc_type)
+        pub_date = get_date_from_name(doc.name, cls.doc_type)
         doc_name = get_name_from_cover(cls.doc_type, pages[0], is_all_cap_title=False)
         is_sec_element = False
         page_num = 0
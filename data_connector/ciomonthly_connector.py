@@ -2,12 +2,9 @@ __author__ = ['Victoria Barenne']
 __version__ = 'v2.0'
 
 
-import os
-from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal, LTRect
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_name, get_name_from_cover
-from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_char_colors, remove_hyphenation, concat_lines, remove_uncommon_utf8, clean_text, is_within_rectangles, get_colors
+from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_char_colors, concat_lines, clean_text, is_within_rectangles, get_colors
 import numpy as np
 from datetime import datetime 
 
@@ -19,15 +16,15 @@ class CIOMonthlyConnector(BaseConnector):
     page_start = 1
     
     @classmethod
-    def get_json_all(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_json_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
         page_num = 1
         is_sec_element = True
 
         doc_name, pub_date = [el.get_text().strip() for el in pages[2] if isinstance(el, LTTextBoxHorizontal)][:2]
         pub_date = datetime.strptime(pub_date, '%d %B %Y').strftime('%Y-%m-%d')
-        src_doc = os.path.basename(fp).replace('.pdf', '')
+        src_doc = doc.name.replace('.pdf', '')
         first_page_sec = cls.get_first_page(page = pages[0])
         sec_json = cls.format_section(pub_date=pub_date, src_doc=src_doc, pg_num=page_num,
                                       doc_name=doc_name, sec_title=cls.first_page, sec_header='',
@@ -36,7 +33,7 @@ class CIOMonthlyConnector(BaseConnector):
 
         cur_header = ""
         cur_section = []
-        for page in pages[1:]:
+        for page in doc.iter_pages(start=1):
             elements, is_last_page, is_sec_element = cls.get_page_elements(page, is_sec_element)
             sections, cur_header, cur_section = cls.get_sections(elements, cur_header=cur_header, cur_section=cur_section)
             page_num += 1
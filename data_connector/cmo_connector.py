@@ -1,14 +1,9 @@
 __author__ = ['Victoria Barenne']
 __version__ = 'v2.0'
 
-import os
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal, LTLine, LTChar
+from pdfminer.layout import LTTextBoxHorizontal, LTLine, LTChar
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_header, get_name_from_cover, remove_legal_disclaimer, get_page_number, get_page_number_from_title, get_date_from_name
-from utils.pdf_helper.text_helper import clean_text, is_text_in_font_size, concat_lines, get_colors, get_char_colors
-from settings import JB_LEGAL_DISCLAIMER
-import numpy as np
+from utils.pdf_helper.text_helper import clean_text, concat_lines
 from datetime import datetime
 from utils.table_extractor import table_extractor, get_n_th_line_height 
 import pandas as pd
@@ -17,10 +12,11 @@ class CMOConnector(BaseConnector):
     doc_type = 'CMO Equity'
     left_sec_x0 = 300
     sec_title_font = 12
+    page_numbers = (0, 1)
 
     @classmethod
-    def get_all_components(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_components_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
 
         left_elements = cls.get_left_elements(pages[0])
@@ -29,7 +25,7 @@ class CMOConnector(BaseConnector):
         title = left_sections[0][0]
         subtitle = left_sections[1][0]
         market_opportunity, company_profile, key_risks = "", "", ""
-        src_doc = os.path.basename(fp).replace('.pdf', '')
+        src_doc = doc.name.replace('.pdf', '')
         pub_date, equity_name = cls.get_pub_date_and_equity(pages)
 
         for sec in left_sections[2:]: 
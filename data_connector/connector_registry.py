@@ -0,0 +1,47 @@
+import importlib
+from collections.abc import Mapping
+
+# connector of each series, as `module:Class`
+CONNECTORS = {
+    'base': 'data_connector.base_connector:BaseConnector',
+    'rw': 'data_connector.rw_connector:RWConnector',
+    'wire': 'data_connector.wire_connector:WireConnector',
+    'rf': 'data_connector.rf_connector:RFConnector',
+    'cio': 'data_connector.cio_connector:CIOConnector',
+    'ciomonthly': 'data_connector.ciomonthly_connector:CIOMonthlyConnector',
+    'cmo': 'data_connector.cmo_connector:CMOConnector',
+    'equitydeepdive': 'data_connector.equitydeepdive_connector:EquityDeepDiveConnector',
+    'equityswitch': 'data_connector.equityswitch_connector:EquitySwitchConnector',
+    'equitytoppicks': 'data_connector.equitytoppicks_connector:EquityTopPicksConnector',
+}
+
+
+class ConnectorRegistry(Mapping):
+    """Connector classes by name; a connector module, with its dependencies, is only imported when first looked up.
+
+    A process that parses a single series thus never imports the other connectors, nor pandas or
+    NumPy when its connector does not need them.
+    """
+
+    def __init__(self, names=None):
+        self.paths = {name: CONNECTORS[name] for name in (names or CONNECTORS)}
+        self.loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self.loaded:
+            module_name, class_name = self.paths[name].split(':')
+            self.loaded[name] = getattr(importlib.import_module(module_name), class_name)
+        return self.loaded[name]
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+
+connectors = ConnectorRegistry()
+
+
+def get_connector(name: str):
+    return connectors[name]
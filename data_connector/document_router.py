@@ -0,0 +1,59 @@
+from pdfminer.layout import LTTextContainer
+
+from utils.pdf_helper.parsed_document import ParsedDocument
+from utils.trace_helper import span
+
+# connector of each series and the cover strings it is recognised by, matched upper-cased
+COVER_STRINGS = {
+    'equitytoppicks': ('EQUITY TOP PICKS',),
+    'equityswitch': ('EQUITY SWITCH',),
+    'cmo': ('MARKET OPPORTUNITY',),
+    'equitydeepdive': ('BAER INSIGHT', 'EQUITY RESEARCH'),
+    'ciomonthly': ('CIO MONTHLY',),
+    'cio': ('CIO WEEKLY',),
+    'rw': ('RESEARCH WEEKLY',),
+    'rf': ('RESEARCH FOCUS',),
+    'wire': ('THE WIRE',),
+}
+
+
+def find_document_type(text: str):
+    """The connector whose cover string comes first in the text, or None."""
+    text = text.upper()
+    found, found_pos = None, len(text)
+    for document_type, cover_strings in COVER_STRINGS.items():
+        for cover_string in cover_strings:
+            pos = text.find(cover_string)
+            if pos != -1 and pos < found_pos:
+                found, found_pos = document_type, pos
+    return found
+
+
+def get_metadata_text(doc: ParsedDocument) -> str:
+    values = [doc.metadata.get(key) for key in ('Title', 'Subject')]
+    return '\n'.join(value.decode('utf-8', errors='ignore') if isinstance(value, bytes) else value
+                     for value in values if isinstance(value, (bytes, str)))
+
+
+def detect_document_type(doc: ParsedDocument):
+    """Connector for a document from its metadata title, its first page and its file name, or None.
+
+    Only the first page is laid out; when the same document is then handed to the connector, that
+    page is not laid out again.
+    """
+    with span('route', document=doc.name):
+        document_type = find_document_type(get_metadata_text(doc))
+        if document_type is None and doc.page_count > 0:
+            cover = doc.pages[0]
+            document_type = find_document_type(''.join(element.get_text() for element in cover
+                                                        if isinstance(element, LTTextContainer)))
+        if document_type is None:
+            # e.g. 'Research Weekly-2023-03-13.pdf', as downloaded
+            document_type = find_document_type(doc.name.split('-')[0])
+    return document_type
+
+
+def route(fp, name: str = None) -> str:
+    """`detect_document_type` of a file, reading nothing but its metadata and first page."""
+    with ParsedDocument(fp, page_numbers=[0], name=name) as doc:
+        return detect_document_type(doc)
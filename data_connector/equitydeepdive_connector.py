@@ -1,26 +1,22 @@
 __author__ = ['Victoria Barenne']
 __version__ = 'v2.0'
 
-import os
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal
+from pdfminer.layout import LTTextBoxHorizontal
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_header, get_name_from_cover, remove_legal_disclaimer, get_page_number, get_page_number_from_title, get_date_from_name
-from utils.pdf_helper.text_helper import clean_text, is_text_in_font_size, concat_lines, get_colors, get_char_colors
-from settings import JB_LEGAL_DISCLAIMER
-import numpy as np
+from utils.pdf_helper.text_helper import clean_text, concat_lines, get_colors
 
 class EquityDeepDiveConnector(BaseConnector):
     doc_type = 'Equity Deep Dive'
     left_sec_x0 = 250
     sec_title_font = 12
+    page_numbers = (0, 1)
 
     @classmethod
-    def get_all_components(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_components_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
 
-        src_doc = os.path.basename(fp).replace('.pdf', '')
+        src_doc = doc.name.replace('.pdf', '')
         front_page_elements = [el for el in pages[0]]
         equity_name = clean_text(front_page_elements[0].get_text())
         equity_info = front_page_elements[1].get_text().split("|")
@@ -1,30 +1,25 @@
 __author__ = ['Victoria Barenne']
 __version__ = 'v2.0'
 
-import os
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal, LTLine
+from pdfminer.layout import LTTextBoxHorizontal, LTLine
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_header, get_name_from_cover, remove_legal_disclaimer, get_page_number, get_page_number_from_title, get_date_from_name
-from utils.pdf_helper.text_helper import clean_text, is_text_in_font_size, concat_lines, get_colors, get_char_colors
-from settings import JB_LEGAL_DISCLAIMER
+from utils.pdf_helper.text_helper import clean_text, concat_lines, get_colors
 import numpy as np
-import pandas as pd
 from datetime import datetime
-from fuzzywuzzy import fuzz
 from utils.table_extractor import table_extractor, get_n_th_line_height
 
 class EquitySwitchConnector(BaseConnector):
     doc_type = 'Equity Switch Idea'
     left_sec_x0 = 250
     sec_title_font = 12
+    page_numbers = (0, 1)
 
     @classmethod
-    def get_all_components(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_components_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
 
-        src_doc = os.path.basename(fp).replace('.pdf', '')
+        src_doc = doc.name.replace('.pdf', '')
         pub_date, doc_name, equity1_shortname, equity2_shortname, rating1, rating2 = cls.get_title_page_info(pages)
 
         comparaison_table = cls.extract_comparaison_table(pages[1], equity2_shortname)
@@ -2,15 +2,12 @@ __author__ = ['Victoria Barenne']
 __version__ = 'v2.0'
 
 
-import os
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal, LTLine
+from pdfminer.layout import LTTextBoxHorizontal, LTLine
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_name, get_name_from_cover
-from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_char_colors, remove_hyphenation, concat_lines, remove_uncommon_utf8, clean_text, get_colors, get_jb_rating
+from utils.pdf_helper.text_helper import concat_lines, clean_text, get_colors, get_jb_rating
 import numpy as np
 import pandas as pd
-from utils.table_extractor import get_n_th_line_height
+from utils.table_extractor import get_n_th_line_height, group_rows_by_y0
 import re
 from datetime import datetime
 
@@ -19,30 +16,26 @@ class EquityTopPicksConnector(BaseConnector):
     contact_page = 'Contact \n'
     left_sec_x0 = 250
     page_start = 2
+    stop_headers = ("MORNINGSTAR ANNEX", "IMPORTANT LEGAL INFORMATION", "IMPORTANT DISTRIBUTION INFORMATION")
     
     @classmethod
-    def get_all_components(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_components_from_document(cls, doc):
+        pages = doc.pages
 
         pub_date = cls.get_pub_date(pages[0])
-        src_doc = os.path.basename(fp).replace('.pdf', '')
-        stop_headers = ["MORNINGSTAR ANNEX", "IMPORTANT LEGAL INFORMATION", "IMPORTANT DISTRIBUTION INFORMATION"]
+        src_doc = doc.name.replace('.pdf', '')
 
         equity_pages_no, deletion_pages_no = [], []
         equity_pages, deletion_pages = {}, []
-        is_last_page = False
 
-        for page_nbr, page in enumerate(pages):
-            elements = [el for el in page]
-            y0s = [el.y0 for el in page]
-            header = elements[np.argmax(y0s)]
+        # the annexes and legal pages close the document: stop laying out pages at the first of them
+        for page_nbr, page in enumerate(doc.iter_pages(until=cls.is_last_page)):
+            header = cls.get_page_header(page)
             if isinstance(header, LTTextBoxHorizontal):
-                if not is_last_page:
-                    is_last_page = header.get_text().startswith(tuple(stop_headers))
-                if not header.get_text().startswith("EQUITY TOP PICKS") and not is_last_page:
+                if not header.get_text().startswith("EQUITY TOP PICKS"):
                     equity_pages[clean_text(header.get_text())] = page
                     equity_pages_no.append(page_nbr + 1)
-                elif header.get_text().startswith("EQUITY TOP PICKS - DELETIONS") and not is_last_page:
+                elif header.get_text().startswith("EQUITY TOP PICKS - DELETIONS"):
                     deletion_pages.append(page)
                     deletion_pages_no.append(page_nbr + 1)
 
@@ -57,6 +50,17 @@ class EquityTopPicksConnector(BaseConnector):
         deletions_table = cls.get_deletions(deletion_pages)
         return equity_extractions, deletions_table, metadata, equity_pages_no, deletion_pages_no
     
+    @classmethod
+    def get_page_header(cls, page):
+        elements = [el for el in page]
+        y0s = [el.y0 for el in page]
+        return elements[np.argmax(y0s)]
+
+    @classmethod
+    def is_last_page(cls, page):
+        header = cls.get_page_header(page)
+        return isinstance(header, LTTextBoxHorizontal) and header.get_text().startswith(cls.stop_headers)
+
     @classmethod
     def get_equity_sections(cls, elements, **kwargs):
         section_text = " ".join([el.get_text() for el in elements])
@@ -121,8 +125,8 @@ class EquityTopPicksConnector(BaseConnector):
             lines = [el.y0 for el in page if isinstance(el, LTLine)]
             first_line_y0, before_last_y0 =np.partition(lines, -2)[-2], np.partition(lines, 1)[1]
             elements = [el for el in page if (el.y0 >before_last_y0 and el.y0<first_line_y0 and isinstance(el, LTTextBoxHorizontal))]
-            for y0 in -np.sort(-np.unique([el.y0 for el in elements])):
-                row = [clean_text(el.get_text()) for el in elements if el.y0==y0]
+            for row in group_rows_by_y0(elements):
+                row = [clean_text(el.get_text()) for el in row]
                 if len(row)==5:
                     deletions_table.append(row + region)
                 elif len(row)==1:
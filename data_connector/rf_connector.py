@@ -2,12 +2,10 @@ __author__ = ['Pei Kaiyu', 'Alvin']
 __version__ = 'v2.0'
 
 
-import os
-from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTPage
 from data_connector.base_connector import BaseConnector
 from utils.pdf_helper.doc_helper import get_page_number_from_title, get_date_from_context, get_name_from_color
-from utils.pdf_helper.text_helper import is_header_match, remove_hyphenation, concat_lines, remove_uncommon_utf8
+from utils.pdf_helper.text_helper import is_header_match, normalise_text
 
 
 class RFConnector(BaseConnector):
@@ -19,8 +17,8 @@ class RFConnector(BaseConnector):
     overlap = 150
 
     @classmethod
-    def get_json_all(cls, fp: str):
-        pages = list(extract_pages(fp))
+    def get_json_from_document(cls, doc):
+        pages = doc.pages
         front_page = [element for element in pages[0] if isinstance(element, LTTextContainer)]
         json_list = []
 
@@ -97,7 +95,4 @@ class RFConnector(BaseConnector):
 
     @classmethod
     def clean_text(cls, text):
-        text = remove_hyphenation(text)
-        text = concat_lines(text)
-        text = remove_uncommon_utf8(text)
-        return text
+        return normalise_text(text)
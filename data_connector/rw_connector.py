@@ -2,9 +2,6 @@ __author__ = ['Pei Kaiyu', 'Chenlong']
 __version__ = 'v2.0'
 
 import os
-import json
-from datetime import datetime
-from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTPage
 from data_connector.base_connector import BaseConnector
 from utils.pdf_helper.doc_helper import get_name_from_cover, get_date_from_context, get_page_number, \
@@ -32,8 +29,8 @@ class RWConnector(BaseConnector):
     long_text = 350
 
     @classmethod
-    def get_json_all(cls, fp: str):
-        pages = list(extract_pages(fp))
+    def get_json_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
         front_page = [element for element in pages[0] if isinstance(element, LTTextContainer)]
 
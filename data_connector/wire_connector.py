@@ -1,11 +1,9 @@
 __author__ = ['Pei Kaiyu', 'Chenlong']
 __version__ = 'v2.0'
 
-import os
-from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTPage, LTTextBoxHorizontal
 from data_connector.base_connector import BaseConnector
-from utils.pdf_helper.doc_helper import get_date_from_header, get_name_from_cover, remove_legal_disclaimer, get_page_number, get_page_number_from_title
+from utils.pdf_helper.doc_helper import get_date_from_header, get_name_from_cover, get_page_number, get_page_number_from_title, get_title_index
 from utils.pdf_helper.text_helper import clean_text, is_text_in_font_size, concat_lines
 from settings import JB_LEGAL_DISCLAIMER
 
@@ -25,12 +23,12 @@ class WireConnector(BaseConnector):
     sec_title_font = 12
 
     @classmethod
-    def get_json_all(cls, fp):
-        pages = list(extract_pages(fp))
+    def get_json_from_document(cls, doc):
+        pages = doc.pages
         json_list = []
 
         pub_date = get_date_from_header(pages[0])
-        src_doc = os.path.basename(fp).replace('.pdf', '')
+        src_doc = doc.name.replace('.pdf', '')
         doc_name = get_name_from_cover(cls.doc_type, pages[0])
 
         market_update_num = get_page_number(list(pages[0])[1])
@@ -84,8 +82,7 @@ class WireConnector(BaseConnector):
             if element.x0 < cls.left_sec_x0:
                 market_update_sec.append(element.get_text())
 
-        sec_text = clean_text(market_update_sec)
-        sec_text = remove_legal_disclaimer(sec_text, JB_LEGAL_DISCLAIMER)
+        sec_text = clean_text(market_update_sec, legal_str=JB_LEGAL_DISCLAIMER)
         return sec_text
 
     @classmethod
@@ -94,18 +91,7 @@ class WireConnector(BaseConnector):
 
     @classmethod
     def get_page_number_from_font(cls, pages: list, title: str, font_size: int) -> int:
-        for page_number, page in enumerate(pages, start=1):
-            for element in page:
-                if not isinstance(element, LTTextContainer):
-                    continue
-
-                if not element.get_text().startswith(title):
-                    continue
-
-                element_list = list(list(element)[0])[0:len(title)]
-                if is_text_in_font_size(element_list, font_size):
-                    return page_number
-        return 0
+        return get_title_index(pages).get_page_number_from_font(title, font_size)
 
     # @classmethod
     # def get_page_number_by_title(cls, pages: list, title: str) -> int:
@@ -173,8 +159,7 @@ class WireConnector(BaseConnector):
         for element_text in elements:
             if concat_lines(element_text).isupper():
                 if len(cur_section) > 0:
-                    text = clean_text(cur_section)
-                    text = remove_legal_disclaimer(text, JB_LEGAL_DISCLAIMER)
+                    text = clean_text(cur_section, legal_str=JB_LEGAL_DISCLAIMER)
                     sections.append([cur_header, text])
                     cur_section = []
 
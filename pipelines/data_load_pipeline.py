@@ -2,78 +2,492 @@ __author__ = ['Pei Kaiyu', 'Jia Chenlong']
 __version__ = 'v2.0'
 
 
+import hashlib
 import os
 import time
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import repeat, islice
 from decouple import config
-from openai import AzureOpenAI
-import pandas as pd
-from data_connector.base_connector import BaseConnector
-from data_connector.rw_connector import RWConnector
-from data_connector.cio_connector import CIOConnector
-from data_connector.wire_connector import WireConnector
-from data_connector.rf_connector import RFConnector
+from data_connector.connector_registry import ConnectorRegistry
+from data_connector.document_router import detect_document_type
 from utils.pdf_helper.doc_helper import get_name_from_path
+from utils.pdf_helper.parsed_document import ParsedDocument
+from utils.manifest_helper import IngestionManifest
+from utils.output_helper import JsonlWriter
+from utils.trace_helper import tracer, span
+from utils.embedding_helper.batch_helper import make_batches, scatter, estimate_tokens
+from utils.embedding_helper.cache_helper import EmbeddingCache
+from utils.embedding_helper.async_helper import gather_bounded, is_loop_running
+from utils.embedding_helper.provider_helper import AzureOpenAIProvider, HashEmbeddingProvider
+from utils.embedding_helper.rate_limit_helper import RateLimiter, CircuitBreaker, EmbeddingError, CircuitOpenError, \
+    is_retryable, is_breaker_failure, get_retry_after, get_backoff_delay
 
 
 class DataProcessPipeline:
-    file_parser = {'cio': CIOConnector(), 'wire': WireConnector(), 'rw': RWConnector(), 'rf': RFConnector(),
-                   'base': BaseConnector()}
-    client = AzureOpenAI(api_key=config("OPENAI_API_KEY"), api_version=config('CHAT_API_VERSION', '2023-03-15-preview'),
-                         azure_endpoint=f"https://{config('OPENAI_SERVICE')}.openai.azure.com")
-    embedding_model = config('EMBEDDING_MODEL')
+    # connectors are imported on first use, see `ConnectorRegistry`
+    file_parser = ConnectorRegistry(['cio', 'wire', 'rw', 'rf', 'ciomonthly', 'base'])
+    # parser routing each file to its connector, see `parse_file`
+    auto_parser = 'auto'
+    # 'azure' for the Azure OpenAI deployment, 'local' for deterministic hash-based vectors needing no credentials
+    embedding_provider_name = config('EMBEDDING_PROVIDER', 'azure')
+    embedding_dimension = config('EMBEDDING_DIMENSION', 1536, cast=int)
+    # created on the first embedding request, see `get_embedding_provider`
+    embedding_provider = None
+    api_key = config('OPENAI_API_KEY', None)
+    api_version = config('CHAT_API_VERSION', '2023-03-15-preview')
+    # OPENAI_ENDPOINT points the clients at another server, e.g. the stand-in of benchmarks/embedding_server.py
+    azure_endpoint = config('OPENAI_ENDPOINT', '') or f"https://{config('OPENAI_SERVICE', '')}.openai.azure.com"
+    embedding_model = config('EMBEDDING_MODEL', '')
+    embedding_batch_size = config('EMBEDDING_BATCH_SIZE', 16, cast=int)
+    embedding_batch_tokens = config('EMBEDDING_BATCH_TOKENS', 8000, cast=int)
+    embedding_cache_path = config('EMBEDDING_CACHE_PATH', '')
+    embedding_cache_bytes = config('EMBEDDING_CACHE_BYTES', 2 * 1024 ** 3, cast=int)
+    embedding_cache = None
+    # reuse the vector of a near-identical section, see `get_embeddings_deduplicated`; ':memory:' within a run only
+    embedding_dedup_path = config('EMBEDDING_DEDUP_PATH', '')
+    embedding_dedup_threshold = config('EMBEDDING_DEDUP_THRESHOLD', 0.9, cast=float)
+    embedding_dedup_max_sections = config('EMBEDDING_DEDUP_MAX_SECTIONS', 1_000_000, cast=int)
+    embedding_dedup_index = None
+    embedding_async = config('EMBEDDING_ASYNC', False, cast=bool)
+    embedding_concurrency = config('EMBEDDING_CONCURRENCY', 16, cast=int)
+    embedding_max_retries = config('EMBEDDING_MAX_RETRIES', 10, cast=int)
+    rate_limiter = RateLimiter(rpm=config('EMBEDDING_RPM', 1440, cast=int), tpm=config('EMBEDDING_TPM', 240000, cast=int))
+    circuit_breaker = CircuitBreaker(failure_threshold=config('EMBEDDING_BREAKER_FAILURES', 5, cast=int),
+                                     reset_timeout=config('EMBEDDING_BREAKER_TIMEOUT', 30.0, cast=float))
+    manifest_path = config('INGESTION_MANIFEST_PATH', 'ingestion_manifest.sqlite')
 
     @classmethod
-    def get_all(cls, fp_list, file_type=None):
+    def get_all(cls, fp_list, file_type='auto'):
         all_json, failed_files = cls.get_json(fp_list, file_type)
-        all_embedded_json = cls.add_embedding(all_json)
+        failed_rows = []
+        all_embedded_json = cls.add_embedding(all_json, failed_rows=failed_rows)
+        # files with sections left out of the output are reported with the files that failed to parse
+        add_failed_documents(failed_files, failed_rows)
         return all_embedded_json, failed_files
 
     @classmethod
-    def get_json(cls, fp_list, parser='base'):
-        data_connector = cls.file_parser[parser]
-        json_list = []
-        failed_fp_list = []
+    def get_all_incremental(cls, fp_list, output_dir, parser='auto', workers=1, chunksize=4):
+        """Ingest new, changed or failed files, or those of another parser version; `(output_paths, failed_files)`."""
+        manifest = IngestionManifest(cls.manifest_path)
+        connector_version = cls.get_parser_version(parser)
+        # the same file given as a relative and an absolute path is ingested once
+        unique_fps = {}
+        for fp in fp_list:
+            unique_fps.setdefault(os.path.abspath(fp), fp)
+        fp_list = list(unique_fps.values())
+        output_paths, failed_files = [], []
+        file_hashes = {}
         for fp in fp_list:
             try:
-                json_list += data_connector.get_json_all(fp)
-            except Exception as e:
-                print(f'The file cannot be processed by {parser} data connector due to the error: {e}')
+                file_hashes[fp] = manifest.get_file_hash(fp)
+            except OSError as e:
+                print(f'The file cannot be read due to the error: {e}')
+                failed_files.append(get_name_from_path(fp))
+        pending = [fp for fp, file_hash in file_hashes.items()
+                   if manifest.needs_processing(fp, file_hash, parser, connector_version)]
+        print(f'{len(pending)} of {len(fp_list)} files to ingest, {len(file_hashes) - len(pending)} unchanged')
+
+        os.makedirs(output_dir, exist_ok=True)
+        for fp, sections, error in cls.iter_parsed(pending, parser, workers, chunksize):
+            if error is not None:
+                print(f'The file cannot be processed by {parser} data connector due to the error: {error}')
+                manifest.mark_failed(fp, file_hashes[fp], parser, connector_version, error)
+                failed_files.append(get_name_from_path(fp))
+                continue
+
+            failed_rows = []
+            output_path = os.path.join(output_dir, get_output_name(fp))
+            with open(output_path, 'w') as output_file:
+                output_file.write(cls.add_embedding(sections, failed_rows=failed_rows))
+            output_paths.append(output_path)
+            if failed_rows:
+                # written without the sections that failed; the whole file is ingested again next run
+                manifest.mark_failed(fp, file_hashes[fp], parser, connector_version,
+                                     f'{len(failed_rows)} sections could not be embedded', output_path)
+                failed_files.append(get_name_from_path(fp))
+            else:
+                manifest.mark_done(fp, file_hashes[fp], parser, connector_version, output_path)
+
+        print(f'Ingestion manifest: {manifest.stats()}')
+        manifest.close()
+        return output_paths, failed_files
+
+    @classmethod
+    def get_parser_version(cls, parser) -> str:
+        if parser != cls.auto_parser:
+            return cls.file_parser[parser].get_version()
+        # a routed file may go to any connector: a new version of any of them ingests the files again
+        return ','.join(f'{name}={connector.get_version()}' for name, connector in cls.file_parser.items())
+
+    @classmethod
+    def parse_file(cls, fp, parser='auto') -> list[dict]:
+        """Sections of a file; `auto` picks the connector from the cover, the base one for series without one."""
+        if parser != cls.auto_parser:
+            return cls.file_parser[parser].get_json_all(fp)
+        with ParsedDocument(fp) as doc:
+            document_type = detect_document_type(doc)
+            if document_type not in cls.file_parser:
+                print(f'Warning: {doc.name} detected as {document_type or "unknown"}, which has no section connector; '
+                      f'parsed with the base connector')
+            return cls.file_parser.get(document_type, cls.file_parser['base']).get_json_all(doc)
+
+    @classmethod
+    def get_json(cls, fp_list, parser='auto', workers=1, chunksize=4, ordered=True):
+        """Parse files into section dicts, in a process pool with `workers` > 1; `(json_list, failed_fp_list)`."""
+        json_list = []
+        failed_fp_list = []
+        for fp, sections, error in cls.iter_parsed(fp_list, parser, workers, chunksize, ordered):
+            if error is not None:
+                print(f'The file cannot be processed by {parser} data connector due to the error: {error}')
                 failed_fp_list.append(get_name_from_path(fp))
                 continue
+            json_list += sections
         return json_list, failed_fp_list
-    
+
     @classmethod
-    def add_embedding(cls, json_file_list) -> dict:
-        frames = []
-       
-        for json_file in json_file_list:
-            input_df = pd.json_normalize(json_file)
-            input_df = input_df.dropna(subset=['section_text'])
-            input_df['section_text_with_metadata'] = \
-                'publication_date: ' + input_df['publication_date'] + '\n' \
-                + 'series: ' + input_df['series'] + '\n' \
-                + 'document_name: ' + input_df['document_name'] + '\n' \
-                + 'section_header: ' + input_df['section_header'] + '\n' \
-                + input_df['section_text']
-            input_df['section_text_with_metadata_embedding'] = input_df['section_text_with_metadata'].map(cls.get_embedding)
-            frames.append(input_df)
-
-        result = pd.concat(frames)
+    def iter_parsed(cls, fp_list, parser='auto', workers=1, chunksize=4, ordered=True):
+        """Yield `(fp, sections, error)` for each file, parsed as described in `get_json`."""
+        chunks = [fp_list[i:i + chunksize] for i in range(0, len(fp_list), chunksize)]
+
+        if workers <= 1:
+            for chunk_results, events in map(parse_files, repeat(parser), chunks):
+                tracer.extend(events)
+                yield from chunk_results
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # only a window of chunks is in flight, so finished results are not held until the generator ends
+            chunks = iter(chunks)
+            futures = deque(executor.submit(parse_files, parser, chunk) for chunk in islice(chunks, 2 * workers))
+            while futures:
+                if ordered:
+                    future = futures.popleft()
+                else:
+                    future = next(iter(wait(futures, return_when=FIRST_COMPLETED).done))
+                    futures.remove(future)
+                chunk_results, events = future.result()
+                futures.extend(executor.submit(parse_files, parser, chunk) for chunk in islice(chunks, 1))
+                tracer.extend(events)
+                yield from chunk_results
+
+    @classmethod
+    def write_all(cls, fp_list, output_path, parser='auto', workers=1, chunksize=4, max_records=None,
+                  flush_sections=256):
+        """Parse, embed and stream sections to JSON lines `flush_sections` at a time; `(output_paths, failed_files)`."""
+        failed_files, pending = [], []
+        with JsonlWriter(output_path, max_records) as writer:
+            for fp, sections, error in cls.iter_parsed(fp_list, parser, workers, chunksize, ordered=False):
+                if error is not None:
+                    print(f'The file cannot be processed by {parser} data connector due to the error: {error}')
+                    failed_files.append(get_name_from_path(fp))
+                    continue
+                pending += sections
+                if len(pending) >= flush_sections:
+                    cls.write_embedded(writer, pending, failed_files)
+                    pending = []
+            cls.write_embedded(writer, pending, failed_files)
+        print(f'{writer.records} sections written to {len(writer.paths)} files')
+        return writer.paths, failed_files
+
+    @classmethod
+    def write_embedded(cls, writer, sections, failed_files):
+        if len(sections) == 0:
+            return
+        failed_rows = []
+        input_df = cls.embed_sections(sections, failed_rows=failed_rows)
+        if len(input_df) > 0:
+            with span('serialise', sections=len(input_df)):
+                lines = input_df.to_json(orient='records', lines=True).rstrip('\n').split('\n')
+            writer.write_lines(lines)
+        add_failed_documents(failed_files, failed_rows)
+
+    @classmethod
+    def add_embedding(cls, json_file_list, failed_rows=None) -> dict:
+        """Embed the sections as JSON records, adding the rows that could not be embedded to `failed_rows`."""
+        if len(json_file_list) == 0:
+            return '[]'
+
+        input_df = cls.embed_sections(json_file_list, failed_rows=failed_rows)
         print('Embedding data completed')
-        return result.to_json(orient='records')
+        if cls.embedding_cache is not None:
+            print(f'Embedding cache: {cls.embedding_cache.stats()}')
+        if cls.embedding_dedup_index is not None:
+            print(f'Near-duplicate sections: {cls.embedding_dedup_index.stats()}')
+        with span('serialise', sections=len(input_df)):
+            return input_df.to_json(orient='records')
+
+    @classmethod
+    def embed_sections(cls, json_file_list, failed_rows=None) -> 'pd.DataFrame':
+        """Sections with their text with metadata and its embedding, as for `add_embedding`, as a DataFrame."""
+        import pandas as pd
+        with span('normalise', sections=len(json_file_list)):
+            input_df = pd.json_normalize(json_file_list)
+            input_df = input_df.dropna(subset=['section_text'])
+            if cls.get_dedup_index() is None:
+                input_df['section_text_with_metadata'] = \
+                    'publication_date: ' + input_df['publication_date'] + '\n' \
+                    + 'series: ' + input_df['series'] + '\n' \
+                    + 'document_name: ' + input_df['document_name'] + '\n' \
+                    + 'section_header: ' + input_df['section_header'] + '\n' \
+                    + input_df['section_text']
+            else:
+                # the date and document name change with every issue, so a vector reused from another issue
+                # would carry them; with deduplication they are left out and kept as fields only
+                input_df['section_text_with_metadata'] = \
+                    'series: ' + input_df['series'] + '\n' \
+                    + 'section_header: ' + input_df['section_header'] + '\n' \
+                    + input_df['section_text']
+        with span('embed', sections=len(input_df)):
+            texts = input_df['section_text_with_metadata'].tolist()
+            if cls.get_dedup_index() is None:
+                embeddings = cls.get_embeddings(texts)
+            else:
+                embeddings, duplicate_of = cls.get_embeddings_deduplicated(
+                    texts, input_df['id'].tolist(), input_df['source_document'].tolist())
+                # may name a section of an earlier run; once its document is ingested again it leaves the index,
+                # but records written before keep the old id
+                input_df['near_duplicate_of'] = pd.Series(duplicate_of, index=input_df.index, dtype=object)
+        input_df['section_text_with_metadata_embedding'] = pd.Series(embeddings, index=input_df.index, dtype=object)
+
+        is_failed = input_df['section_text_with_metadata_embedding'].isna()
+        if is_failed.any():
+            failed = input_df.loc[is_failed, ['id', 'source_document', 'page_number']].to_dict(orient='records')
+            print(f'{len(failed)} sections could not be embedded and are left out: {failed}')
+            if failed_rows is not None:
+                failed_rows += failed
+            input_df = input_df[~is_failed]
+        return input_df
+
+    @classmethod
+    def get_embedding_provider(cls):
+        if cls.embedding_provider is None:
+            if cls.embedding_provider_name == 'local':
+                cls.embedding_provider = HashEmbeddingProvider(cls.embedding_dimension)
+            elif cls.embedding_provider_name == 'azure':
+                cls.embedding_provider = AzureOpenAIProvider(cls.api_key, cls.api_version, cls.azure_endpoint,
+                                                             cls.embedding_model)
+            else:
+                raise ValueError(f'Unknown embedding provider {cls.embedding_provider_name!r}, expected azure or local')
+        return cls.embedding_provider
+
+    @classmethod
+    def get_embedding_cache(cls):
+        if cls.embedding_cache is None and cls.embedding_cache_path:
+            cls.embedding_cache = EmbeddingCache(cls.embedding_cache_path, cls.embedding_cache_bytes)
+        return cls.embedding_cache
+
+    @classmethod
+    def get_dedup_index(cls):
+        if cls.embedding_dedup_index is None and cls.embedding_dedup_path:
+            from utils.embedding_helper.dedup_helper import NearDuplicateIndex
+            cls.embedding_dedup_index = NearDuplicateIndex(cls.embedding_dedup_path, cls.embedding_dedup_threshold,
+                                                           cls.embedding_dedup_max_sections)
+        return cls.embedding_dedup_index
+
+    @classmethod
+    def get_embeddings_deduplicated(cls, texts: list[str], ids: list[str],
+                                    source_documents: list[str]) -> tuple[list, list]:
+        """Embeddings of texts and the id of the section whose near-identical text's vector each reuses, or None."""
+        index = cls.get_dedup_index()
+        provider_name = cls.get_embedding_provider().name
+        index.replace_documents(provider_name, source_documents)
+        signatures = [index.hasher.get_signature(text) for text in texts]
+        band_keys = [index.get_band_keys(signature) for signature in signatures]
+        indexed = index.find_indexed(provider_name, signatures, band_keys)
+        representatives = index.group(signatures, band_keys, skip=[match is not None for match in indexed])
+
+        unique = [i for i, (match, rep) in enumerate(zip(indexed, representatives)) if match is None and rep == i]
+        unique_embeddings = cls.get_embeddings([texts[i] for i in unique])
+        index.add(provider_name, [ids[i] for i in unique], [source_documents[i] for i in unique],
+                  [signatures[i] for i in unique], [band_keys[i] for i in unique], unique_embeddings)
+        embedding_by_position = dict(zip(unique, unique_embeddings))
+
+        embeddings, duplicate_of = [], []
+        for i, (match, rep) in enumerate(zip(indexed, representatives)):
+            if match is not None:
+                duplicate_of.append(match[0])
+                embeddings.append(match[1])
+            else:
+                duplicate_of.append(None if rep == i else ids[rep])
+                embeddings.append(embedding_by_position[rep])
+        index.embedded += len(unique)
+        index.reused_indexed += sum(match is not None for match in indexed)
+        index.reused_batch += len(texts) - len(unique) - sum(match is not None for match in indexed)
+        return embeddings, duplicate_of
+
+    @classmethod
+    def get_embeddings(cls, texts: list[str]) -> list[list[float]]:
+        """Embed texts, reusing the vectors of the embedding cache and requesting only the missing ones."""
+        cache = cls.get_embedding_cache()
+        if cache is None:
+            return cls.request_embeddings(texts)
+
+        provider_name = cls.get_embedding_provider().name
+        embeddings = cache.get_many(provider_name, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        missing_texts = list(dict.fromkeys(texts[i] for i in missing))
+        missing_embeddings = cls.request_embeddings(missing_texts)
+        cache.put_many(provider_name, missing_texts, missing_embeddings)
+
+        embedding_by_text = dict(zip(missing_texts, missing_embeddings))
+        for i in missing:
+            embeddings[i] = embedding_by_text[texts[i]]
+        return embeddings
+
+    @classmethod
+    def request_embeddings(cls, texts: list[str]) -> list[list[float]]:
+        """Embed texts in as few requests as the limits allow, None for those of a batch that failed for good."""
+        batches = make_batches(texts, cls.embedding_batch_size, cls.embedding_batch_tokens)
+        batch_texts = [[texts[i] for i in batch] for batch in batches]
+        if cls.embedding_async and not is_loop_running():
+            batch_results = asyncio.run(cls.request_batches_async(batch_texts))
+        else:
+            batch_results = [cls.try_batch_embedding(texts) for texts in batch_texts]
+        return scatter(batches, batch_results, len(texts))
+
+    @classmethod
+    async def request_embeddings_async(cls, texts: list[str]) -> list[list[float]]:
+        batches = make_batches(texts, cls.embedding_batch_size, cls.embedding_batch_tokens)
+        batch_results = await cls.request_batches_async([[texts[i] for i in batch] for batch in batches])
+        return scatter(batches, batch_results, len(texts))
+
+    @classmethod
+    async def request_batches_async(cls, batch_texts: list[list[str]]) -> list[list[list[float]]]:
+        """Send the batches with up to `embedding_concurrency` requests in flight, results in batch order."""
+        async with cls.get_embedding_provider().open_async() as embed:
+            return await gather_bounded(lambda texts: cls.try_batch_embedding_async(embed, texts),
+                                        batch_texts, cls.embedding_concurrency)
 
     @classmethod
     def get_embedding(cls, text: str) -> list[float]:
-        retry = 0
-        while retry < 10:
+        return cls.get_batch_embedding([text])[0]
+
+    @classmethod
+    def try_batch_embedding(cls, texts: list[str]) -> list:
+        try:
+            return cls.get_batch_embedding(texts)
+        except EmbeddingError as e:
+            print(f'A batch of {len(texts)} sections could not be embedded: {e}')
+            return [None] * len(texts)
+
+    @classmethod
+    async def try_batch_embedding_async(cls, embed, texts: list[str]) -> list:
+        try:
+            return await cls.get_batch_embedding_async(embed, texts)
+        except EmbeddingError as e:
+            print(f'A batch of {len(texts)} sections could not be embedded: {e}')
+            return [None] * len(texts)
+
+    @classmethod
+    def get_batch_embedding(cls, texts: list[str]) -> list[list[float]]:
+        steps = cls.iter_request_steps(texts)
+        step, value = next(steps)
+        while True:
+            embeddings = error = None
+            if step == 'sleep':
+                time.sleep(value)
+            elif step == 'acquire':
+                cls.rate_limiter.acquire(value)
+            else:
+                try:
+                    embeddings = cls.get_embedding_provider().embed(texts)
+                except Exception as e:
+                    error = e
+            try:
+                step, value = steps.send(error)
+            except StopIteration:
+                return embeddings
+
+    @classmethod
+    async def get_batch_embedding_async(cls, embed, texts: list[str]) -> list[list[float]]:
+        steps = cls.iter_request_steps(texts)
+        step, value = next(steps)
+        while True:
+            embeddings = error = None
+            if step == 'sleep':
+                await asyncio.sleep(value)
+            elif step == 'acquire':
+                await cls.rate_limiter.acquire_async(value)
+            else:
+                try:
+                    embeddings = await embed(texts)
+                except Exception as e:
+                    error = e
+            try:
+                step, value = steps.send(error)
+            except StopIteration:
+                return embeddings
+
+    @classmethod
+    def iter_request_steps(cls, texts: list[str]):
+        """Retry, breaker and backoff decisions of a batch as steps; each 'embed' step is sent its error or None."""
+        tokens = sum(estimate_tokens(text) for text in texts)
+        attempt = 0
+        circuit_waits = 0
+        while True:
+            wait = cls.get_circuit_wait(circuit_waits)
+            if wait:
+                with span('circuit_open_wait'):
+                    yield 'sleep', wait
+                circuit_waits += 1
+                continue
+            with span('rate_limit_wait'):
+                yield 'acquire', tokens
+            with span('embedding_request', texts=len(texts), attempt=attempt):
+                error = yield 'embed', attempt
+            if error is None:
+                cls.circuit_breaker.record_success()
+                return
+            yield 'sleep', cls.get_retry_delay(error, attempt)
+            attempt += 1
+
+    @classmethod
+    def get_circuit_wait(cls, waits: int) -> float:
+        """Seconds to wait for the open circuit to let a request through, or CircuitOpenError past the retry budget."""
+        wait = cls.circuit_breaker.check()
+        if wait and waits >= cls.embedding_max_retries:
+            raise CircuitOpenError(f'embedding circuit still open after waiting {waits} times')
+        return wait
+
+    @classmethod
+    def get_retry_delay(cls, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying a failed request, or EmbeddingError if it must not be retried."""
+        if is_breaker_failure(error):
+            cls.circuit_breaker.record_failure()
+        else:
+            cls.circuit_breaker.release()
+        if not is_retryable(error):
+            raise EmbeddingError(f'fatal error: {error}') from error
+        if attempt >= cls.embedding_max_retries:
+            raise EmbeddingError(f'gave up after {attempt + 1} attempts: {error}') from error
+        delay = get_backoff_delay(attempt, retry_after=get_retry_after(error))
+        print(f"An error occurred: {error}, retrying in {delay:.1f}s")
+        return delay
+
+
+def get_output_name(fp) -> str:
+    """Output file name of a source file; files of the same name in different folders get different names."""
+    path_hash = hashlib.sha256(os.path.abspath(fp).encode()).hexdigest()[:12]
+    return f'{os.path.splitext(os.path.basename(fp))[0]}-{path_hash}.json'
+
+
+def add_failed_documents(failed_files: list, failed_rows: list):
+    """Add the source documents of the sections that could not be embedded to `failed_files`, once each."""
+    for src_doc in dict.fromkeys(row['source_document'] for row in failed_rows):
+        if src_doc not in failed_files:
+            failed_files.append(src_doc)
+
+
+def parse_files(parser, fp_list):
+    """Parse a chunk of files with one connector, returning `(fp, sections, error)` per file and the trace events."""
+    results = []
+    with tracer.collect() as events:
+        for fp in fp_list:
             try:
-                result = cls.client.embeddings.create(model=cls.embedding_model, input=text)
-                embedding = result.data[0].embedding
-                return embedding
+                with span('document', document=os.path.basename(fp), connector=parser):
+                    results.append((fp, DataProcessPipeline.parse_file(fp, parser), None))
             except Exception as e:
-                print(f"An error occurred: {e}")
-                # embedding = []  #
-                time.sleep(2)
-                retry += 1
-        return []
-    
+                results.append((fp, None, str(e)))
+    return results, events
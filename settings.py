@@ -1,6 +1,17 @@
+import os
+
 # EMBEDDING_MODEL = config('EMBEDDING_MODEL', 'BJB-ChatGPT-PoC-embedding-ada-002')
 
 STOP_STRINGS = ['IMPORTANT LEGAL INFORMATION', 'Important Legal Information']
 FOOTER_FONT = 8
 
 JB_LEGAL_DISCLAIMER = 'Julius Baer Research | Please find important legal information at the end of this document.'
+
+# directory of the on-disk layout cache, disabled when empty
+LAYOUT_CACHE_DIR = os.environ.get('LAYOUT_CACHE_DIR', '')
+
+# number of parsed documents the Streamlit viewer keeps in its cache
+APP_CACHE_ENTRIES = int(os.environ.get('APP_CACHE_ENTRIES', 32))
+
+# file the stage timings are written to as a Chrome trace, tracing disabled when empty
+TRACE_PATH = os.environ.get('TRACE_PATH', '')
@@ -0,0 +1,14 @@
+import random
+from datetime import date
+
+import pytest
+
+from benchmarks.pdf_writer import write_pdf
+from benchmarks.synthetic_corpus import make_base
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    path = tmp_path / 'Base-20230313.pdf'
+    write_pdf(str(path), make_base(random.Random(0), date(2023, 3, 13), 3), "D:20230313080000+01'00'")
+    return str(path)
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from utils.embedding_helper.dedup_helper import NearDuplicateIndex
+
+WORDS = ['rates', 'inflation', 'growth', 'equities', 'bonds', 'credit', 'spread', 'yield', 'curve', 'dollar',
+         'euro', 'policy', 'earnings', 'margin', 'outlook', 'risk', 'demand', 'supply', 'labour', 'wages']
+
+
+def make_text(seed: int, n_words: int = 300) -> str:
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(n_words))
+
+
+def edit_one_word(text: str) -> str:
+    words = text.split()
+    words[len(words) // 2] = 'changed'
+    return ' '.join(words)
+
+
+def index_texts(index, texts, source_document='a.pdf', model='m'):
+    signatures = [index.hasher.get_signature(text) for text in texts]
+    band_keys = [index.get_band_keys(signature) for signature in signatures]
+    ids = [f'{source_document}-{i}' for i in range(len(texts))]
+    index.add(model, ids, [source_document] * len(texts), signatures, band_keys,
+              [[float(i), 1.0] for i in range(len(texts))])
+    return ids
+
+
+def find(index, text, model='m'):
+    signature = index.hasher.get_signature(text)
+    return index.find_indexed(model, [signature], [index.get_band_keys(signature)])[0]
+
+
+@pytest.fixture
+def index():
+    index = NearDuplicateIndex(':memory:', threshold=0.9)
+    yield index
+    index.close()
+
+
+def test_identical_and_near_identical_texts_match(index):
+    text = make_text(0)
+    ids = index_texts(index, [text, make_text(1)])
+
+    assert find(index, text) == (ids[0], [0.0, 1.0])
+    assert find(index, edit_one_word(text))[0] == ids[0]
+    assert find(index, make_text(2)) is None
+    assert find(index, text, model='other') is None
+
+
+def test_threshold_one_only_matches_identical_text(index):
+    index.threshold = 1.0
+    text = make_text(0)
+    index_texts(index, [text])
+
+    assert find(index, text) is not None
+    assert find(index, edit_one_word(text)) is None
+
+
+def test_group_within_a_batch(index):
+    texts = [make_text(0), make_text(1), edit_one_word(make_text(0)), make_text(0)]
+    signatures = [index.hasher.get_signature(text) for text in texts]
+    band_keys = [index.get_band_keys(signature) for signature in signatures]
+
+    assert index.group(signatures, band_keys, skip=[False] * 4) == [0, 1, 0, 0]
+    assert index.group(signatures, band_keys, skip=[True, False, False, False]) == [0, 1, 2, 2]
+
+
+def test_least_recently_used_sections_are_evicted(index):
+    index.max_sections = 2
+    texts = [make_text(seed) for seed in range(3)]
+    first = index_texts(index, texts[:2])
+    # reusing the first text keeps it over the second
+    assert find(index, texts[0])[0] == first[0]
+    index_texts(index, texts[2:], source_document='b.pdf')
+
+    assert index.stats()['sections'] == 2
+    assert index.evictions == 1
+    assert find(index, texts[0]) is not None
+    assert find(index, texts[1]) is None
+    assert index.conn.execute('SELECT COUNT(*) FROM bands').fetchone()[0] == 2 * index.bands
+
+
+def test_document_indexed_again_replaces_its_earlier_sections(tmp_path):
+    path = str(tmp_path / 'dedup.sqlite')
+    text = make_text(0)
+    first_run = NearDuplicateIndex(path)
+    index_texts(first_run, [text])
+    first_run.close()
+
+    second_run = NearDuplicateIndex(path)
+    assert find(second_run, text) is not None
+    second_run.replace_documents('m', ['b.pdf'])
+    assert find(second_run, text) is not None
+    second_run.replace_documents('m', ['a.pdf'])
+    assert find(second_run, text) is None
+    assert second_run.stats()['sections'] == 0
+    second_run.close()
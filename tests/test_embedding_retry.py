@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pipelines import data_load_pipeline
+from pipelines.data_load_pipeline import DataProcessPipeline
+from utils.embedding_helper.provider_helper import EmbeddingProvider
+from utils.embedding_helper.rate_limit_helper import RateLimiter, CircuitBreaker
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class ScriptedProvider(EmbeddingProvider):
+    """Raises the scripted errors in turn, then embeds."""
+    name = 'scripted'
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(data_load_pipeline.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(DataProcessPipeline, 'rate_limiter', RateLimiter(rpm=0, tpm=0))
+    monkeypatch.setattr(DataProcessPipeline, 'circuit_breaker', CircuitBreaker(failure_threshold=2, reset_timeout=5.0))
+    monkeypatch.setattr(DataProcessPipeline, 'embedding_max_retries', 10)
+    monkeypatch.setattr(DataProcessPipeline, 'embedding_async', False)
+    return sleeps
+
+
+def use_provider(monkeypatch, provider):
+    monkeypatch.setattr(DataProcessPipeline, 'embedding_provider', provider)
+    return provider
+
+
+def test_rate_limiting_does_not_open_the_circuit(pipeline, monkeypatch):
+    provider = use_provider(monkeypatch, ScriptedProvider([StatusError(429, {'retry-after': '2'})] * 5))
+
+    assert DataProcessPipeline.request_embeddings(['a', 'bb'] * 4) == [[1.0], [2.0]] * 4
+    assert provider.calls == 6
+    assert DataProcessPipeline.circuit_breaker.opened_at is None
+    assert all(delay >= 2 for delay in pipeline)
+
+
+def test_open_circuit_waits_then_probes(pipeline, monkeypatch):
+    provider = use_provider(monkeypatch, ScriptedProvider([StatusError(503), StatusError(503)]))
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(data_load_pipeline.time, 'sleep', lambda delay: clock.__setitem__(0, clock[0] + delay))
+
+    assert DataProcessPipeline.request_embeddings(['abc']) == [[3.0]]
+    # the two 503s opened the circuit; the third call is the half-open probe after `reset_timeout`
+    assert provider.calls == 3
+    assert DataProcessPipeline.circuit_breaker.opened_at is None
+
+
+def test_open_circuit_gives_up_past_the_retry_budget(pipeline, monkeypatch):
+    use_provider(monkeypatch, ScriptedProvider([StatusError(503)] * 100))
+    monkeypatch.setattr(DataProcessPipeline, 'embedding_max_retries', 3)
+
+    assert DataProcessPipeline.request_embeddings(['abc']) == [None]
+
+
+def test_async_rate_limiting_does_not_open_the_circuit(pipeline, monkeypatch):
+    provider = use_provider(monkeypatch, ScriptedProvider([StatusError(429, {'retry-after-ms': '1'})] * 5))
+
+    async def no_sleep(delay):
+        pass
+    monkeypatch.setattr(data_load_pipeline.asyncio, 'sleep', no_sleep)
+
+    async def run():
+        async with provider.open_async() as embed:
+            return await DataProcessPipeline.get_batch_embedding_async(embed, ['a', 'bb'])
+
+    assert asyncio.run(run()) == [[1.0], [2.0]]
+    assert provider.calls == 6
+    assert DataProcessPipeline.circuit_breaker.opened_at is None
+
+
+def test_provider_errors_fail_the_batch_without_openai(pipeline, monkeypatch):
+    provider = use_provider(monkeypatch, ScriptedProvider([ValueError('bad input')]))
+    # as on a machine without openai, where the local provider is used
+    monkeypatch.setitem(sys.modules, 'openai', None)
+
+    assert DataProcessPipeline.request_embeddings(['a', 'bb']) == [None, None]
+    assert provider.calls == 1
+
+
+def test_async_embedding_from_a_running_loop(pipeline, monkeypatch):
+    use_provider(monkeypatch, ScriptedProvider([]))
+    monkeypatch.setattr(DataProcessPipeline, 'embedding_async', True)
+
+    async def run():
+        return DataProcessPipeline.request_embeddings(['a', 'bb']), \
+            await DataProcessPipeline.request_embeddings_async(['a', 'bb'])
+
+    assert asyncio.run(run()) == ([[1.0], [2.0]], [[1.0], [2.0]])
@@ -0,0 +1,53 @@
+import os
+import pickle
+
+from pdfminer.layout import LTTextContainer
+
+from utils.pdf_helper.layout_cache import LayoutCache
+from utils.pdf_helper.parsed_document import ParsedDocument
+
+
+def get_texts(doc):
+    return [[(element.bbox, element.get_text()) for element in page if isinstance(element, LTTextContainer)]
+            for page in doc.pages]
+
+
+def test_pages_round_trip(sample_pdf, tmp_path):
+    cache = LayoutCache(str(tmp_path / 'cache'))
+    with ParsedDocument(sample_pdf, layout_cache=False) as doc:
+        expected, metadata, page_count = get_texts(doc), doc.metadata, doc.page_count
+    with ParsedDocument(sample_pdf, layout_cache=cache) as doc:
+        assert get_texts(doc) == expected
+        assert doc.metadata == metadata
+    with ParsedDocument(sample_pdf, layout_cache=cache) as doc:
+        assert get_texts(doc) == expected
+        assert doc.metadata == metadata
+        assert doc.pages_laid_out == 0 and doc.document is None
+    assert cache.hits == page_count
+
+
+def test_page_selection_caches_the_document(sample_pdf, tmp_path):
+    cache = LayoutCache(str(tmp_path / 'cache'))
+    with ParsedDocument(sample_pdf, layout_cache=False) as doc:
+        page_count = doc.page_count
+    with ParsedDocument(sample_pdf, page_numbers=(0, 1), layout_cache=cache) as doc:
+        expected = get_texts(doc)
+    with ParsedDocument(sample_pdf, page_numbers=(0, 1), layout_cache=cache) as doc:
+        assert doc.page_count == 2
+        assert get_texts(doc) == expected
+        assert doc.document is None
+    with ParsedDocument(sample_pdf, layout_cache=cache) as doc:
+        assert doc.page_count == page_count
+
+
+def test_undecodable_entries_are_misses(sample_pdf, tmp_path):
+    cache = LayoutCache(str(tmp_path / 'cache'))
+    with ParsedDocument(sample_pdf, layout_cache=cache) as doc:
+        expected = get_texts(doc)
+        key = doc.cache_key
+    for name in ('document.bin', 'page-0.bin'):
+        with open(cache.get_path(key, name), 'wb') as file:
+            file.write(pickle.dumps(os.getcwd))
+    with ParsedDocument(sample_pdf, layout_cache=cache) as doc:
+        assert get_texts(doc) == expected
+        assert doc.pages_laid_out == 1
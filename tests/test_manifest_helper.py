@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import utils.manifest_helper
+from utils.manifest_helper import IngestionManifest
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF first version')
+    return str(path)
+
+
+@pytest.fixture
+def hash_reads(monkeypatch):
+    reads = []
+    get_file_hash = utils.manifest_helper.get_file_hash
+    monkeypatch.setattr(utils.manifest_helper, 'get_file_hash', lambda file: reads.append(1) or get_file_hash(file))
+    return reads
+
+
+def test_done_files_are_skipped_until_they_change(source, tmp_path):
+    path = str(tmp_path / 'manifest.sqlite')
+    manifest = IngestionManifest(path)
+    file_hash = manifest.get_file_hash(source)
+    assert manifest.needs_processing(source, file_hash, 'base', '1')
+    manifest.mark_done(source, file_hash, 'base', '1', 'out.json')
+    manifest.close()
+
+    manifest = IngestionManifest(path)
+    assert not manifest.needs_processing(source, manifest.get_file_hash(source), 'base', '1')
+    assert manifest.needs_processing(source, file_hash, 'base', '2')
+    assert manifest.needs_processing(source, file_hash, 'rw', '1')
+    with open(source, 'ab') as file:
+        file.write(b' changed')
+    manifest = IngestionManifest(path)
+    assert manifest.needs_processing(source, manifest.get_file_hash(source), 'base', '1')
+
+
+def test_failed_files_are_retried(source, tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'manifest.sqlite'))
+    file_hash = manifest.get_file_hash(source)
+    manifest.mark_failed(source, file_hash, 'base', '1', 'error')
+    assert manifest.needs_processing(source, file_hash, 'base', '1')
+    assert manifest.get_entry(source)['error'] == 'error'
+
+
+def test_unchanged_files_are_not_hashed_again(source, tmp_path, hash_reads):
+    path = str(tmp_path / 'manifest.sqlite')
+    manifest = IngestionManifest(path)
+    manifest.mark_done(source, manifest.get_file_hash(source), 'base', '1', 'out.json')
+    assert len(hash_reads) == 1
+    assert not IngestionManifest(path).needs_processing(source, IngestionManifest(path).get_file_hash(source), 'base', '1')
+    assert len(hash_reads) == 1
+
+    # touched but not changed: hashed once more, then the new mtime is recorded
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    IngestionManifest(path).get_file_hash(source)
+    IngestionManifest(path).get_file_hash(source)
+    assert len(hash_reads) == 2
+
+
+def test_relative_and_absolute_paths_share_an_entry(source, tmp_path, monkeypatch, hash_reads):
+    monkeypatch.chdir(tmp_path)
+    manifest = IngestionManifest(str(tmp_path / 'manifest.sqlite'))
+    file_hash = manifest.get_file_hash('doc.pdf')
+    assert manifest.get_file_hash(source) == file_hash and len(hash_reads) == 1
+    manifest.mark_done('doc.pdf', file_hash, 'base', '1', 'out.json')
+    assert not manifest.needs_processing(source, file_hash, 'base', '1')
+
+
+def test_missing_files_raise_os_error(tmp_path):
+    with pytest.raises(OSError):
+        IngestionManifest(str(tmp_path / 'manifest.sqlite')).get_file_hash(str(tmp_path / 'missing.pdf'))
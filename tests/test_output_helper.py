@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from utils.output_helper import JsonlWriter
+
+
+def test_records_are_split_into_files(tmp_path):
+    with JsonlWriter(str(tmp_path / 'out.jsonl'), max_records=2) as writer:
+        writer.write_lines(['{"a": 1}', '{"a": 2}', '{"a": 3}'])
+    assert sorted(os.listdir(tmp_path)) == ['out-00000.jsonl', 'out-00001.jsonl']
+    assert (tmp_path / 'out-00001.jsonl').read_text() == '{"a": 3}\n'
+    assert writer.records == 3
+
+
+def test_empty_output_gets_an_empty_file(tmp_path):
+    with JsonlWriter(str(tmp_path / 'out.jsonl')):
+        pass
+    assert (tmp_path / 'out.jsonl').read_text() == ''
+
+
+def test_partial_file_is_discarded_on_exception(tmp_path):
+    with pytest.raises(RuntimeError):
+        with JsonlWriter(str(tmp_path / 'out.jsonl'), max_records=2) as writer:
+            writer.write_lines(['{}'] * 3)
+            raise RuntimeError
+    # the complete first file is kept, the partial second one is neither renamed nor left behind
+    assert os.listdir(tmp_path) == ['out-00000.jsonl']
+    assert writer.paths == [str(tmp_path / 'out-00000.jsonl')]
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from benchmarks.table_extractor_benchmark import make_box, make_comparison_page, make_deletion_elements, \
+    reference_group_rows_by_y0, reference_table_extractor
+from utils.table_extractor import group_rows_by_y0, table_extractor
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_table_extractor_matches_the_previous_implementation(seed):
+    rng = random.Random(seed)
+    page, ymin, ymax = make_comparison_page(rng.randint(1, 40), rng)
+    for has_header in (False, True):
+        result = table_extractor(page, ymin, ymax, has_header=has_header)
+        expected = reference_table_extractor(page, ymin, ymax, has_header=has_header)
+        assert result.equals(expected)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_group_rows_by_y0_matches_the_previous_implementation(seed):
+    rng = random.Random(seed)
+    elements = make_deletion_elements(rng.randint(1, 60), rng)
+    assert group_rows_by_y0(elements) == reference_group_rows_by_y0(elements)
+
+
+def test_group_rows_by_y0_orders_rows_top_down():
+    low, high_right, high_left = make_box(20, 100, 60, 'low'), make_box(200, 300, 260, 'b'), make_box(20, 300, 60, 'a')
+    assert group_rows_by_y0([low, high_right, high_left]) == [[high_right, high_left], [low]]
+    assert group_rows_by_y0([]) == []
@@ -0,0 +1,25 @@
+from utils.pdf_helper.text_helper import PatternMatcher, clean_text, get_substr_first_pos
+
+
+def test_find_all_includes_overlapping_matches():
+    matcher = PatternMatcher(['abc', 'bcd', 'ab', ''])
+    assert matcher.find_all('xabcde abx') == [(1, 'abc'), (2, 'bcd'), (7, 'ab')]
+
+
+def test_find_all_prefers_the_longest_pattern_per_start():
+    assert PatternMatcher(['Important', 'Important Information']).find_all('Important Information') == \
+        [(0, 'Important Information')]
+
+
+def test_no_patterns():
+    matcher = PatternMatcher([])
+    assert matcher.find_all('text') == [] and matcher.first_match_pos('text') is None
+
+
+def test_first_match_pos():
+    assert get_substr_first_pos('see Disclaimer and Disclosures', ['Disclosures', 'Disclaimer']) == 4
+    assert get_substr_first_pos('nothing here', ['Disclaimer']) is None
+
+
+def test_clean_text_joins_lines_and_drops_control_characters():
+    assert clean_text(['exam-\nple\x07 text\n', 'more']) == 'example textmore'
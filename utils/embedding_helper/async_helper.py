@@ -0,0 +1,21 @@
+import asyncio
+
+
+async def gather_bounded(coro_fn, items, concurrency: int) -> list:
+    """Run `coro_fn` on every item with at most `concurrency` calls in flight, results in item order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await coro_fn(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def is_loop_running() -> bool:
+    """Whether this thread already runs an event loop, e.g. in a notebook, where `asyncio.run` is refused."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
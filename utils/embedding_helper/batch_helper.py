@@ -0,0 +1,36 @@
+import math
+
+# rough characters-per-token ratio of the ada / text-embedding tokenizers on English prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def make_batches(texts: list[str], max_items: int, max_tokens: int) -> list[list[int]]:
+    """Pack texts, in order, into batches of positions bounded by item count and estimated tokens.
+
+    A text larger than `max_tokens` on its own is sent alone rather than dropped.
+    """
+    batches = []
+    batch, batch_tokens = [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def scatter(batches: list[list[int]], batch_results: list[list], size: int) -> list:
+    """Put the results of each batch back at the positions of the texts they were computed for."""
+    results = [None] * size
+    for batch, batch_result in zip(batches, batch_results):
+        for i, result in zip(batch, batch_result):
+            results[i] = result
+    return results
@@ -0,0 +1,87 @@
+import hashlib
+import sqlite3
+import time
+from array import array
+
+from utils.embedding_helper.sqlite_helper import select_in
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent embedding store keyed by (model name, sha256 of the input text).
+
+    Vectors are kept as float64 blobs in a local SQLite file so that they round-trip exactly. When
+    the stored vectors exceed `max_bytes`, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 ** 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS embeddings ('
+                          'model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, '
+                          'size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, text_hash))')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM embeddings').fetchone()[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list:
+        """Return the cached vector of each text, or None where it is not cached."""
+        hashes = [get_text_hash(text) for text in texts]
+        rows = select_in(self.conn, 'SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({})',
+                         [model], set(hashes))
+        found = {text_hash: array('d', vector).tolist() for text_hash, vector in rows}
+
+        if found:
+            now = time.time()
+            self.conn.executemany('UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?',
+                                  [(now, model, text_hash) for text_hash in found])
+            self.conn.commit()
+
+        vectors = [found.get(text_hash) for text_hash in hashes]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]):
+        now = time.time()
+        for text, vector in zip(texts, vectors):
+            if not vector:
+                continue
+            blob = array('d', vector).tobytes()
+            text_hash = get_text_hash(text)
+            previous = self.conn.execute('SELECT size FROM embeddings WHERE model = ? AND text_hash = ?',
+                                         (model, text_hash)).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)',
+                              (model, text_hash, blob, len(blob), now))
+            self.total_bytes += len(blob) - (previous[0] if previous else 0)
+        self.evict()
+        self.conn.commit()
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute('SELECT model, text_hash, size FROM embeddings ORDER BY last_used LIMIT 100').fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            for model, text_hash, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM embeddings WHERE model = ? AND text_hash = ?', (model, text_hash))
+                self.total_bytes -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'bytes': self.total_bytes}
+
+    def close(self):
+        self.conn.close()
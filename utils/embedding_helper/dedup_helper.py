@@ -0,0 +1,191 @@
+import hashlib
+import sqlite3
+import time
+import uuid
+import zlib
+from array import array
+
+import numpy as np
+
+from utils.embedding_helper.sqlite_helper import select_in
+from utils.embedding_helper.token_helper import get_words
+
+# Mersenne prime of the universal hash family (a * x + b) mod P of the permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def get_shingles(text: str, size: int = 5) -> set:
+    """Word `size`-grams of the lower-cased text; a text shorter than that is one shingle."""
+    words = get_words(text)
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures: the share of equal values of two signatures estimates the Jaccard similarity of the shingle sets."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # a and x below 2 ** 32 keep a * x + b within uint64
+        self.a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self.shingle_size = shingle_size
+
+    def get_signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in get_shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        return ((self.a * hashes + self.b) % np.uint64(MERSENNE_PRIME)).min(axis=1)
+
+
+def get_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    return float(np.mean(signature == other))
+
+
+class NearDuplicateIndex:
+    """Index of the embedded texts by MinHash signature, to reuse a vector for near-identical text.
+
+    Signatures are split into `bands` bands; texts sharing a band are candidates, kept when their
+    estimated Jaccard similarity of word shingles reaches `threshold`. Signatures, band keys, section
+    ids and vectors are kept per provider in a SQLite file, `:memory:` to only deduplicate within a run.
+    Sections indexed by earlier runs stay until their document is indexed again by a later run, see
+    `replace_documents`, or until the `max_sections` least recently used are evicted.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, max_sections: int = 1_000_000, num_perm: int = 128,
+                 bands: int = 32):
+        self.path = path
+        self.threshold = threshold
+        self.max_sections = max_sections
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.run_id = uuid.uuid4().hex
+        self.reused_indexed = 0
+        self.reused_batch = 0
+        self.embedded = 0
+        self.evictions = 0
+        self.conn = sqlite3.connect(path)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(sections)')]
+        if columns and 'run_id' not in columns:
+            # index of the earlier layout without documents, runs and last use; rebuilt from scratch
+            self.conn.execute('DROP TABLE sections')
+            self.conn.execute('DROP TABLE IF EXISTS bands')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS sections (model TEXT NOT NULL, section_id TEXT NOT NULL, '
+                          'source_document TEXT NOT NULL, run_id TEXT NOT NULL, signature BLOB NOT NULL, '
+                          'vector BLOB NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, section_id))')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS sections_last_used ON sections (last_used)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS sections_document ON sections (model, source_document)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS bands (model TEXT NOT NULL, band_key BLOB NOT NULL, '
+                          'section_id TEXT NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS bands_key ON bands (model, band_key)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS bands_section ON bands (model, section_id)')
+        self.conn.commit()
+        self.size = self.conn.execute('SELECT COUNT(*) FROM sections').fetchone()[0]
+
+    def get_band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [bytes([band]) + hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(),
+                                                digest_size=8).digest()
+                for band in range(self.bands)]
+
+    def replace_documents(self, model: str, source_documents):
+        """Drop the sections of these documents indexed by earlier runs, whose ids the new sections replace."""
+        rows = select_in(self.conn, 'SELECT section_id FROM sections WHERE model = ? AND run_id != ? '
+                                    'AND source_document IN ({})', [model, self.run_id], set(source_documents))
+        self.delete(model, [section_id for section_id, in rows])
+        self.conn.commit()
+
+    def find_indexed(self, model: str, signatures: list, band_keys: list) -> list:
+        """`(section_id, vector)` of the most similar indexed text of each signature, or None below the threshold."""
+        candidates = [set() for _ in signatures]
+        positions = {}
+        for i, keys in enumerate(band_keys):
+            for key in keys:
+                positions.setdefault(key, []).append(i)
+        rows = select_in(self.conn, 'SELECT band_key, section_id FROM bands WHERE model = ? AND band_key IN ({})',
+                         [model], positions)
+        for key, section_id in rows:
+            for i in positions[key]:
+                candidates[i].add(section_id)
+
+        rows = select_in(self.conn, 'SELECT section_id, signature FROM sections WHERE model = ? AND section_id IN ({})',
+                         [model], set().union(*candidates))
+        indexed = {section_id: np.frombuffer(signature, dtype=np.uint64) for section_id, signature in rows}
+        best_ids = []
+        for signature, section_ids in zip(signatures, candidates):
+            best, best_similarity = None, self.threshold
+            for section_id in sorted(section_ids & indexed.keys()):
+                similarity = get_similarity(signature, indexed[section_id])
+                if similarity >= best_similarity:
+                    best, best_similarity = section_id, similarity
+            best_ids.append(best)
+
+        found = set(best_ids) - {None}
+        rows = select_in(self.conn, 'SELECT section_id, vector FROM sections WHERE model = ? AND section_id IN ({})',
+                         [model], found)
+        vectors = {section_id: array('d', vector).tolist() for section_id, vector in rows}
+        if found:
+            now = time.time()
+            self.conn.executemany('UPDATE sections SET last_used = ? WHERE model = ? AND section_id = ?',
+                                  [(now, model, section_id) for section_id in found])
+            self.conn.commit()
+        return [None if best is None else (best, vectors[best]) for best in best_ids]
+
+    def group(self, signatures: list, band_keys: list, skip: list) -> list[int]:
+        """Position of the first earlier text each text is a near-duplicate of, its own position if none."""
+        buckets = {}
+        representatives = []
+        for i, (signature, keys) in enumerate(zip(signatures, band_keys)):
+            if skip[i]:
+                representatives.append(i)
+                continue
+            candidates = {j for key in keys for j in buckets.get(key, ())}
+            best, best_similarity = i, self.threshold
+            for j in sorted(candidates):
+                similarity = get_similarity(signature, signatures[j])
+                if similarity >= best_similarity:
+                    best, best_similarity = j, similarity
+            representatives.append(best)
+            if best == i:
+                for key in keys:
+                    buckets.setdefault(key, []).append(i)
+        return representatives
+
+    def add(self, model: str, section_ids: list[str], source_documents: list[str], signatures: list, band_keys: list,
+            vectors: list):
+        now = time.time()
+        for section_id, source_document, signature, keys, vector in zip(section_ids, source_documents, signatures,
+                                                                        band_keys, vectors):
+            if not vector:
+                continue
+            self.delete(model, [section_id])
+            self.conn.execute('INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?)',
+                              (model, section_id, source_document, self.run_id, signature.tobytes(),
+                               array('d', vector).tobytes(), now))
+            self.conn.executemany('INSERT INTO bands VALUES (?, ?, ?)', [(model, key, section_id) for key in keys])
+            self.size += 1
+        self.evict()
+        self.conn.commit()
+
+    def delete(self, model: str, section_ids: list[str]):
+        for section_id in section_ids:
+            deleted = self.conn.execute('DELETE FROM sections WHERE model = ? AND section_id = ?',
+                                        (model, section_id)).rowcount
+            self.conn.execute('DELETE FROM bands WHERE model = ? AND section_id = ?', (model, section_id))
+            self.size -= deleted
+
+    def evict(self):
+        if self.size <= self.max_sections:
+            return
+        rows = self.conn.execute('SELECT model, section_id FROM sections ORDER BY last_used LIMIT ?',
+                                 (self.size - self.max_sections,)).fetchall()
+        for model, section_id in rows:
+            self.delete(model, [section_id])
+        self.evictions += len(rows)
+
+    def stats(self) -> dict:
+        return {'embedded': self.embedded, 'reused_indexed': self.reused_indexed, 'reused_batch': self.reused_batch,
+                'evictions': self.evictions, 'sections': self.size}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,80 @@
+import hashlib
+import math
+from contextlib import asynccontextmanager
+
+from utils.embedding_helper.token_helper import get_words
+
+
+class EmbeddingProvider:
+    """Turns batches of texts into vectors, one request per batch.
+
+    Errors are raised as they come, e.g. the `openai` exceptions, so that the pipeline retries them
+    with its own backoff and rate limiting. `name` identifies the vectors in the embedding cache.
+    """
+    name = None
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def open_async(self):
+        """Yield a coroutine function embedding a batch, valid within the running event loop."""
+        async def embed(texts):
+            return self.embed(texts)
+        yield embed
+
+
+class AzureOpenAIProvider(EmbeddingProvider):
+    """The embeddings endpoint of an Azure OpenAI deployment, or of a stand-in at `azure_endpoint`."""
+
+    def __init__(self, api_key: str, api_version: str, azure_endpoint: str, model: str):
+        self.api_key = api_key
+        self.api_version = api_version
+        self.azure_endpoint = azure_endpoint
+        self.name = model
+        self.client = None
+
+    def get_client(self):
+        if self.client is None:
+            # the openai package alone takes most of the import time of the pipeline
+            from openai import AzureOpenAI
+            # retries are left to the caller, with backoff and rate limiting shared by all requests
+            self.client = AzureOpenAI(api_key=self.api_key, api_version=self.api_version,
+                                      azure_endpoint=self.azure_endpoint, max_retries=0)
+        return self.client
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        result = self.get_client().embeddings.create(model=self.name, input=texts)
+        return [data.embedding for data in sorted(result.data, key=lambda data: data.index)]
+
+    @asynccontextmanager
+    async def open_async(self):
+        from openai import AsyncAzureOpenAI
+        # the async client is bound to the running event loop, so it lives for this context only
+        async with AsyncAzureOpenAI(api_key=self.api_key, api_version=self.api_version,
+                                    azure_endpoint=self.azure_endpoint, max_retries=0) as async_client:
+            async def embed(texts):
+                result = await async_client.embeddings.create(model=self.name, input=texts)
+                return [data.embedding for data in sorted(result.data, key=lambda data: data.index)]
+            yield embed
+
+
+def get_hash_embedding(text: str, dimension: int) -> list[float]:
+    """Unit vector of signed word counts hashed into `dimension` buckets; texts sharing words get close vectors."""
+    vector = [0.0] * dimension
+    for token in get_words(text):
+        digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+        vector[digest % dimension] += 1.0 if digest >> 63 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """Deterministic local vectors, see `get_hash_embedding`, to run the embedding stage without credentials."""
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+        self.name = f'local-hash-{dimension}'
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [get_hash_embedding(text, self.dimension) for text in texts]
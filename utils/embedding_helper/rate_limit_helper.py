@@ -0,0 +1,160 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class EmbeddingError(Exception):
+    """An embedding request failed for good: fatal error, retries exhausted or circuit open."""
+
+
+class CircuitOpenError(EmbeddingError):
+    pass
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute, holding at most one minute of quota."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` from the bucket and return how long to wait before it is actually available."""
+        self.refill()
+        # a request larger than the whole bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+
+class RateLimiter:
+    """Keeps requests under both a requests-per-minute and a tokens-per-minute quota; 0 disables a quota."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        delays = [0.0]
+        with self.lock:
+            if self.request_bucket is not None:
+                delays.append(self.request_bucket.reserve(1))
+            if self.token_bucket is not None:
+                delays.append(self.token_bucket.reserve(tokens))
+        return max(delays)
+
+    def acquire(self, tokens: int):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stops sending requests after `failure_threshold` consecutive failures, for `reset_timeout` seconds.
+
+    Once the timeout has passed one probe request is let through while the others keep waiting:
+    success closes the circuit again, failure re-opens it. Only failures saying the service is down
+    count, see `is_breaker_failure`; rate limiting is handled by backing off.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def check(self) -> float:
+        """Seconds to wait before sending a request, 0 when it may go now, possibly as the half-open probe."""
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            now = time.monotonic()
+            remaining = self.reset_timeout - (now - self.opened_at)
+            if self.probing or remaining > 0:
+                return remaining if remaining > 0 else self.reset_timeout
+            self.probing = True
+            self.opened_at = now
+            return 0.0
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        """The request failed without telling whether the service is up, e.g. a 429: let another probe through."""
+        with self.lock:
+            self.probing = False
+
+
+def is_connection_error(error: Exception) -> bool:
+    # imported here so that importing the helpers does not import openai; it is loaded once a request failed
+    try:
+        import openai
+    except ImportError:
+        # e.g. the local provider on a machine without openai: its errors are not connection errors
+        return False
+    return isinstance(error, (openai.APITimeoutError, openai.APIConnectionError))
+
+
+def is_retryable(error: Exception) -> bool:
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code in (408, 409, 429) or status_code >= 500
+    return is_connection_error(error)
+
+
+def is_breaker_failure(error: Exception) -> bool:
+    """Whether the error says the service is down: 5xx, timeouts and connection errors, not rate limiting."""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code >= 500 and get_retry_after(error) is None
+    return is_connection_error(error)
+
+
+def get_retry_after(error: Exception):
+    """Seconds the server asked us to wait, from the `retry-after-ms` / `retry-after` headers, if any."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        return None
+    return None
+
+
+def get_backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0, retry_after: float = None) -> float:
+    """Exponential backoff with full jitter, never shorter than the server's `Retry-After`."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
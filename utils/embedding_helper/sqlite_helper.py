@@ -0,0 +1,12 @@
+# stay below SQLite's limit on bound parameters
+MAX_PARAMETERS = 500
+
+
+def select_in(conn, query: str, params: list, values) -> list:
+    """Rows of `query` for all `values`, its `{}` filled with an `IN` list, run in chunks; `params` come first."""
+    values = list(values)
+    rows = []
+    for i in range(0, len(values), MAX_PARAMETERS):
+        chunk = values[i:i + MAX_PARAMETERS]
+        rows += conn.execute(query.format(','.join('?' * len(chunk))), [*params, *chunk]).fetchall()
+    return rows
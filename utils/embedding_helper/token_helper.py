@@ -0,0 +1,8 @@
+import re
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def get_words(text: str) -> list[str]:
+    """Lower-cased words of a text, as the local embeddings and the near-duplicate shingles see it."""
+    return TOKEN_PATTERN.findall(text.lower())
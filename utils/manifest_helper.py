@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import time
+
+from utils.pdf_helper.layout_cache import get_file_hash
+
+DONE = 'done'
+FAILED = 'failed'
+
+
+class IngestionManifest:
+    """Record of the files already ingested, in a local SQLite file.
+
+    Each source file is stored with the sha256 of its content, the connector and connector version
+    that processed it, where its output was written and whether it succeeded. A file needs processing
+    again when it is new, its content changed, it was processed by another connector or connector
+    version, or it failed last time. The size and modification time of the file are stored too, so
+    that an unchanged file is not read again to hash it, see `get_file_hash`. Files are keyed by
+    absolute path, whether they are given as relative or absolute paths.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS files ('
+                          'source_path TEXT PRIMARY KEY, file_hash TEXT NOT NULL, connector TEXT NOT NULL, '
+                          'connector_version TEXT NOT NULL, output_path TEXT, status TEXT NOT NULL, error TEXT, '
+                          'updated_at REAL NOT NULL, file_size INTEGER, file_mtime INTEGER)')
+        # manifests written before the size and modification time were stored
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}
+        for column in ('file_size', 'file_mtime'):
+            if column not in columns:
+                self.conn.execute(f'ALTER TABLE files ADD COLUMN {column} INTEGER')
+        self.conn.commit()
+        self.file_stats = {}
+        self.file_hashes = {}
+
+    def get_file_stat(self, source_path: str) -> tuple:
+        source_path = os.path.abspath(source_path)
+        if source_path not in self.file_stats:
+            stat = os.stat(source_path)
+            self.file_stats[source_path] = (stat.st_size, stat.st_mtime_ns)
+        return self.file_stats[source_path]
+
+    def get_file_hash(self, source_path: str) -> str:
+        """sha256 of the file content, as recorded when its size and modification time are unchanged."""
+        source_path = os.path.abspath(source_path)
+        if source_path not in self.file_hashes:
+            self.file_hashes[source_path] = self.read_file_hash(source_path)
+        return self.file_hashes[source_path]
+
+    def read_file_hash(self, source_path: str) -> str:
+        file_stat = self.get_file_stat(source_path)
+        row = self.conn.execute('SELECT file_hash, file_size, file_mtime FROM files WHERE source_path = ?',
+                                (source_path,)).fetchone()
+        if row is not None and tuple(row[1:]) == file_stat:
+            return row[0]
+        with open(source_path, 'rb') as file:
+            file_hash = get_file_hash(file)
+        if row is not None and row[0] == file_hash:
+            # touched but not changed: no need to hash it again next time
+            self.conn.execute('UPDATE files SET file_size = ?, file_mtime = ? WHERE source_path = ?',
+                              (*file_stat, source_path))
+            self.conn.commit()
+        return file_hash
+
+    def get_entry(self, source_path: str):
+        source_path = os.path.abspath(source_path)
+        row = self.conn.execute('SELECT file_hash, connector, connector_version, output_path, status, error '
+                                'FROM files WHERE source_path = ?', (source_path,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('file_hash', 'connector', 'connector_version', 'output_path', 'status', 'error'), row))
+
+    def needs_processing(self, source_path: str, file_hash: str, connector: str, connector_version: str) -> bool:
+        entry = self.get_entry(source_path)
+        return (entry is None or entry['status'] != DONE or entry['file_hash'] != file_hash
+                or entry['connector'] != connector or entry['connector_version'] != connector_version)
+
+    def record(self, source_path: str, file_hash: str, connector: str, connector_version: str, status: str,
+               output_path: str = None, error: str = None):
+        source_path = os.path.abspath(source_path)
+        file_size, file_mtime = self.get_file_stat(source_path)
+        self.conn.execute('INSERT OR REPLACE INTO files (source_path, file_hash, connector, connector_version, '
+                          'output_path, status, error, updated_at, file_size, file_mtime) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                          (source_path, file_hash, connector, connector_version, output_path, status, error, time.time(),
+                           file_size, file_mtime))
+        self.conn.commit()
+
+    def mark_done(self, source_path: str, file_hash: str, connector: str, connector_version: str, output_path: str):
+        self.record(source_path, file_hash, connector, connector_version, DONE, output_path=output_path)
+
+    def mark_failed(self, source_path: str, file_hash: str, connector: str, connector_version: str, error: str,
+                    output_path: str = None):
+        self.record(source_path, file_hash, connector, connector_version, FAILED, output_path=output_path, error=error)
+
+    def stats(self) -> dict:
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM files GROUP BY status').fetchall())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,69 @@
+import os
+
+
+class JsonlWriter:
+    """Writes JSON records one per line, optionally split into files of at most `max_records` records.
+
+    Without `max_records` everything goes to `path`; with it the files are `path` with a `-00000`,
+    `-00001`, ... suffix before the extension. A file is written under a temporary name and only
+    renamed to its final name once complete, so readers never see a partial file. When the `with`
+    block exits with an exception the file being written is removed instead.
+    """
+
+    def __init__(self, path: str, max_records: int = None):
+        self.path = path
+        self.max_records = max_records
+        self.paths = []
+        self.records = 0
+        self.file = None
+        self.file_records = 0
+
+    def get_path(self, index: int) -> str:
+        if self.max_records is None:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f'{root}-{index:05d}{ext}'
+
+    def open_next(self):
+        self.paths.append(self.get_path(len(self.paths)))
+        os.makedirs(os.path.dirname(os.path.abspath(self.paths[-1])), exist_ok=True)
+        self.file = open(self.paths[-1] + '.tmp', 'w', encoding='utf-8')
+        self.file_records = 0
+
+    def close_current(self):
+        if self.file is not None:
+            self.file.close()
+            os.replace(self.paths[-1] + '.tmp', self.paths[-1])
+            self.file = None
+
+    def write_lines(self, lines: list[str]):
+        """Write records already serialised as single-line JSON strings."""
+        for line in lines:
+            if self.file is None or (self.max_records is not None and self.file_records >= self.max_records):
+                self.close_current()
+                self.open_next()
+            self.file.write(line)
+            self.file.write('\n')
+            self.file_records += 1
+            self.records += 1
+
+    def close(self):
+        # an empty output still gets its (empty) file
+        if not self.paths:
+            self.open_next()
+        self.close_current()
+
+    def discard(self):
+        if self.file is not None:
+            self.file.close()
+            os.remove(self.paths.pop() + '.tmp')
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self.discard()
+        else:
+            self.close()
@@ -0,0 +1,284 @@
+import numpy as np
+from pdfminer.layout import LTChar, LTPage, LTTextContainer
+from pdfminer.pdfinterp import PDFGraphicState
+from settings import FOOTER_FONT
+
+
+class ColumnarPage:
+    """A laid-out page held as NumPy arrays instead of a tree of pdfminer objects.
+
+    Three levels are kept, as in the layout tree: the page elements, the lines of the text elements and
+    the characters (`LTChar` and `LTAnno`) of the lines. Each level has its bounding boxes in one
+    `(n, 4)` array and an offset array into the level below; the text of all the characters is one
+    string, and the style of a character (font name, size, non-stroking colour, colour space) is an id
+    into a table of the distinct styles of the page. Elements other than text containers (rects, lines,
+    figures, images) keep their bounding box only.
+
+    Iterating the page yields views that are instances of the original pdfminer classes, so the
+    existing helpers and connectors run unchanged; the arrays allow vectorised filtering.
+    """
+
+    def __init__(self, pageid, bbox, classes, element_class, element_bbox, line_start, line_class, line_bbox,
+                 item_start, item_class, item_bbox, item_style, item_visible, text_start, text, styles):
+        self.pageid = pageid
+        self.bbox = bbox
+        self.classes = classes
+        self.element_class = element_class
+        self.element_bbox = element_bbox
+        self.line_start = line_start
+        self.line_class = line_class
+        self.line_bbox = line_bbox
+        self.item_start = item_start
+        self.item_class = item_class
+        self.item_bbox = item_bbox
+        self.item_style = item_style
+        self.item_visible = item_visible
+        self.text_start = text_start
+        self.text = text
+        self.styles = styles
+        self.style_size = np.array([size for _, size, _, _ in styles], dtype=np.float64)
+        self.graphicstates = [None] * len(styles)
+        self.views = None
+
+    @classmethod
+    def from_layout(cls, page: LTPage) -> 'ColumnarPage':
+        classes, style_ids, styles = [], {}, []
+        element_class, element_bbox, line_start = [], [], [0]
+        line_class, line_bbox, item_start = [], [], [0]
+        item_class, item_bbox, item_style, item_visible, text_start, texts = [], [], [], [], [0], []
+
+        def class_id(obj):
+            if type(obj) not in classes:
+                classes.append(type(obj))
+            return classes.index(type(obj))
+
+        for element in page:
+            element_class.append(class_id(element))
+            element_bbox.append(element.bbox)
+            lines = element if isinstance(element, LTTextContainer) else []
+            for line in lines:
+                line_class.append(class_id(line))
+                line_bbox.append(line.bbox)
+                for item in line:
+                    item_class.append(class_id(item))
+                    texts.append(item.get_text())
+                    text_start.append(text_start[-1] + len(texts[-1]))
+                    item_visible.append(texts[-1].strip() != '')
+                    if isinstance(item, LTChar):
+                        ncolor = item.graphicstate.ncolor
+                        style = (item.fontname, item.size, tuple(ncolor) if isinstance(ncolor, list) else ncolor, item.ncs)
+                        item_bbox.append(item.bbox)
+                        item_style.append(style_ids.setdefault(style, len(style_ids)))
+                        if item_style[-1] == len(styles):
+                            styles.append(style)
+                    else:
+                        item_bbox.append((np.nan,) * 4)
+                        item_style.append(-1)
+                item_start.append(len(item_class))
+            line_start.append(len(line_class))
+
+        return cls(page.pageid, page.bbox, classes,
+                   np.array(element_class, dtype=np.int16), np.array(element_bbox, dtype=np.float64).reshape(-1, 4),
+                   np.array(line_start, dtype=np.int32),
+                   np.array(line_class, dtype=np.int16), np.array(line_bbox, dtype=np.float64).reshape(-1, 4),
+                   np.array(item_start, dtype=np.int32),
+                   np.array(item_class, dtype=np.int16), np.array(item_bbox, dtype=np.float64).reshape(-1, 4),
+                   np.array(item_style, dtype=np.int32), np.array(item_visible, dtype=bool), np.array(text_start, dtype=np.int64), ''.join(texts), styles)
+
+    @property
+    def x0(self) -> np.ndarray:
+        return self.element_bbox[:, 0]
+
+    @property
+    def y0(self) -> np.ndarray:
+        return self.element_bbox[:, 1]
+
+    @property
+    def x1(self) -> np.ndarray:
+        return self.element_bbox[:, 2]
+
+    @property
+    def y1(self) -> np.ndarray:
+        return self.element_bbox[:, 3]
+
+    def __len__(self):
+        return len(self.element_class)
+
+    def get_views(self) -> list:
+        # element views are built once, so an element is the same object on every pass over the page
+        if self.views is None:
+            self.views = [get_view_class(self.classes[class_id])(self, i) for i, class_id in enumerate(self.element_class)]
+        return self.views
+
+    def __getitem__(self, index):
+        return self.get_views()[index]
+
+    def __iter__(self):
+        return iter(self.get_views())
+
+    def is_instance(self, classes) -> np.ndarray:
+        """Boolean mask of the elements that are instances of `classes`, like `isinstance`."""
+        class_mask = np.array([issubclass(c, classes) for c in self.classes], dtype=bool)
+        return class_mask[self.element_class]
+
+    def where(self, mask) -> list:
+        """The elements selected by a boolean mask, in page order."""
+        views = self.get_views()
+        return [views[i] for i in np.flatnonzero(mask)]
+
+    def get_element_items(self, index: int) -> slice:
+        return slice(self.item_start[self.line_start[index]], self.item_start[self.line_start[index + 1]])
+
+    def footer_mask(self) -> np.ndarray:
+        """`is_footer` of every element at once: no visible character bigger than `FOOTER_FONT`."""
+        big = (self.item_style >= 0) & self.item_visible
+        big[big] = np.floor(self.style_size[self.item_style[big]]) > FOOTER_FONT
+        item_line = np.repeat(np.arange(len(self.line_class)), np.diff(self.item_start))
+        line_element = np.repeat(np.arange(len(self)), np.diff(self.line_start))
+        return np.bincount(line_element[item_line[big]], minlength=len(self)) == 0
+
+    def get_graphicstate(self, style_id: int) -> PDFGraphicState:
+        if self.graphicstates[style_id] is None:
+            graphicstate = PDFGraphicState()
+            graphicstate.ncolor = self.styles[style_id][2]
+            self.graphicstates[style_id] = graphicstate
+        return self.graphicstates[style_id]
+
+
+class ColumnarView:
+    """Base of the views on a `ColumnarPage`, mixed into the pdfminer class the view stands for.
+
+    The pdfminer constructor is never called: geometry, text and style are read from the page arrays.
+    """
+
+    level = 'element'
+
+    def __init__(self, page: ColumnarPage, index: int):
+        self.page = page
+        self.index = index
+
+    @property
+    def bbox(self):
+        return tuple(getattr(self.page, f'{self.level}_bbox')[self.index].tolist())
+
+    @property
+    def x0(self):
+        return self.bbox[0]
+
+    @property
+    def y0(self):
+        return self.bbox[1]
+
+    @property
+    def x1(self):
+        return self.bbox[2]
+
+    @property
+    def y1(self):
+        return self.bbox[3]
+
+    @property
+    def width(self):
+        return self.x1 - self.x0
+
+    @property
+    def height(self):
+        return self.y1 - self.y0
+
+    def children(self) -> range:
+        return range(0)
+
+    def get_child_base(self, layout_class: type) -> type:
+        raise NotImplementedError
+
+    def __iter__(self):
+        for index in self.children():
+            layout_class = self.page.classes[self.child_class[index]]
+            yield get_view_class(layout_class, self.get_child_base(layout_class))(self.page, index)
+
+    def __len__(self):
+        return len(self.children())
+
+    @property
+    def _objs(self):
+        return list(self)
+
+    def get_text_range(self) -> slice:
+        raise NotImplementedError
+
+    def get_text(self) -> str:
+        text_range = self.get_text_range()
+        return self.page.text[self.page.text_start[text_range.start]:self.page.text_start[text_range.stop]]
+
+
+class ElementView(ColumnarView):
+    level = 'element'
+
+    @property
+    def child_class(self):
+        return self.page.line_class
+
+    def children(self) -> range:
+        return range(self.page.line_start[self.index], self.page.line_start[self.index + 1])
+
+    def get_child_base(self, layout_class: type) -> type:
+        return LineView
+
+    def get_text_range(self) -> slice:
+        return self.page.get_element_items(self.index)
+
+
+class LineView(ColumnarView):
+    level = 'line'
+
+    @property
+    def child_class(self):
+        return self.page.item_class
+
+    def children(self) -> range:
+        return range(self.page.item_start[self.index], self.page.item_start[self.index + 1])
+
+    def get_child_base(self, layout_class: type) -> type:
+        return CharView if issubclass(layout_class, LTChar) else ItemView
+
+    def get_text_range(self) -> slice:
+        return slice(self.page.item_start[self.index], self.page.item_start[self.index + 1])
+
+
+class ItemView(ColumnarView):
+    level = 'item'
+
+    def get_text_range(self) -> slice:
+        return slice(self.index, self.index + 1)
+
+
+class CharView(ItemView):
+    @property
+    def style(self):
+        return self.page.styles[self.page.item_style[self.index]]
+
+    @property
+    def fontname(self):
+        return self.style[0]
+
+    @property
+    def size(self):
+        return self.style[1]
+
+    @property
+    def ncs(self):
+        return self.style[3]
+
+    @property
+    def graphicstate(self):
+        return self.page.get_graphicstate(self.page.item_style[self.index])
+
+
+VIEW_CLASSES = {}
+
+
+def get_view_class(layout_class: type, base: type = ElementView) -> type:
+    """View class standing for `layout_class`, so that `isinstance` checks on the layout classes still hold."""
+    if (layout_class, base) not in VIEW_CLASSES:
+        VIEW_CLASSES[layout_class, base] = type(f'{layout_class.__name__}View', (base, layout_class), {})
+    return VIEW_CLASSES[layout_class, base]
@@ -1,16 +1,13 @@
-import pdfminer
-from pdfminer.pdfparser import PDFParser
-from pdfminer.pdfdocument import PDFDocument
 from pdfminer.layout import LTTextContainer, LTPage
 from datetime import datetime
 from utils.pdf_helper.text_helper import concat_lines, get_char_colors
+from utils.pdf_helper.parsed_document import ParsedDocument, LazyPages, open_document
+from utils.pdf_helper.title_index import TitleIndex
 
 
-def get_date_from_meta(fp: str) -> str:
-    with open(fp, 'rb') as file:
-        parser = PDFParser(file)
-        docs = PDFDocument(parser)
-        metadata = docs.info[0]
+def get_date_from_meta(fp) -> str:
+    with open_document(fp) as doc:
+        metadata = doc.metadata
         if metadata.get('CreationDate'):
             creation_date = metadata['CreationDate'].decode('utf-8')
             creation_date = creation_date[2:].replace("'", "")
@@ -42,7 +39,9 @@ def get_date_from_context(element: LTTextContainer) -> str:
     return iso_format_date
 
 
-def get_name_from_path(fp: str) -> str:
+def get_name_from_path(fp) -> str:
+    if isinstance(fp, ParsedDocument):
+        fp = fp.name
     name = fp.split('/')[-1].split('.')[0].strip() + '.pdf'
     return name
 
@@ -74,12 +73,15 @@ def get_page_number(element: LTTextContainer) -> int:
     return int(element.get_text().split('/')[0])
 
 
+def get_title_index(pages) -> TitleIndex:
+    """The title index of the document the pages belong to, shared by all queries on it."""
+    if isinstance(pages, LazyPages):
+        return pages.document.title_index
+    return TitleIndex(pages)
+
+
 def get_page_number_from_title(pages: list, title: str) -> int:
-    for page_number, page in enumerate(pages, start=0):
-        for element in page:
-            if isinstance(element, LTTextContainer) and (title in element.get_text()):
-                return page_number
-    return 0
+    return get_title_index(pages).get_page_number_from_title(title)
 
 
 def get_header_and_text(element: LTTextContainer):
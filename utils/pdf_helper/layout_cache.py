@@ -0,0 +1,200 @@
+import hashlib
+import marshal
+import os
+import tempfile
+import zlib
+import pdfminer
+import pdfminer.layout
+from pdfminer.layout import LAParams, LTItem, LTLayoutContainer, LTPage
+from pdfminer.pdfcolor import PDFColorSpace, PREDEFINED_COLORSPACE
+from pdfminer.pdfinterp import PDFGraphicState
+from pdfminer.pdftypes import resolve1
+
+# bump when the encoding below changes, so that older entries are ignored rather than misread
+CACHE_VERSION = 2
+# recomputed from `bbox` on load
+BBOX_ATTRS = ('x0', 'y0', 'x1', 'y1', 'width', 'height')
+LT_CLASSES = {name: obj for name, obj in vars(pdfminer.layout).items() if isinstance(obj, type) and issubclass(obj, LTItem)}
+
+
+class LayoutEncoder:
+    """Turns a laid-out page tree into nested tuples of plain values.
+
+    Every layout object becomes `(schema id, attribute values, children)`, the schema being its class name
+    and attribute names, stored once per page. Colour spaces and graphic states become small dicts, shared
+    between the characters that shared them; other pdfminer objects (streams, references) are dropped.
+    Pages are stored with `marshal`, which only builds plain values: unlike pickle, a tampered cache
+    file cannot run code, and decoding only instantiates pdfminer layout classes.
+    """
+
+    def __init__(self):
+        self.schemas = {}
+        self.memo = {}
+
+    def encode_item(self, item):
+        item_vars = vars(item)
+        attrs = tuple(k for k in item_vars if k not in BBOX_ATTRS and k not in ('_objs', 'groups'))
+        schema_id = self.schemas.setdefault((type(item).__name__, attrs), len(self.schemas))
+        values = tuple(self.encode_value(item_vars[k]) for k in attrs)
+        children = [self.encode_item(child) for child in item_vars['_objs']] if '_objs' in item_vars else None
+        return schema_id, values, children
+
+    def encode_value(self, value):
+        if value is None or isinstance(value, (bool, int, float, str, bytes)):
+            return value
+        if isinstance(value, (tuple, list)):
+            return type(value)(self.encode_value(v) for v in value)
+        if id(value) in self.memo:
+            return self.memo[id(value)][1]
+
+        if isinstance(value, PDFColorSpace):
+            encoded = {'cs': (value.name, value.ncomponents)}
+        elif isinstance(value, PDFGraphicState):
+            encoded = {'gs': {k: self.encode_value(v) for k, v in vars(value).items()}}
+        else:
+            encoded = None
+        # keep the object alive so that its id is not reused during the encoding
+        self.memo[id(value)] = (value, encoded)
+        return encoded
+
+    def encode_page(self, page: LTPage) -> bytes:
+        root = self.encode_item(page)
+        schemas = [schema for schema, _ in sorted(self.schemas.items(), key=lambda kv: kv[1])]
+        return zlib.compress(marshal.dumps((schemas, root)))
+
+
+class LayoutDecoder:
+    """Rebuilds genuine pdfminer layout objects from `LayoutEncoder` output."""
+
+    def __init__(self, schemas):
+        self.schemas = [(LT_CLASSES[name], attrs) for name, attrs in schemas]
+        self.memo = {}
+
+    def decode_item(self, node):
+        schema_id, values, children = node
+        cls, attrs = self.schemas[schema_id]
+        item = object.__new__(cls)
+        item_vars = vars(item)
+        for k, v in zip(attrs, values):
+            item_vars[k] = self.decode_value(v)
+        if 'bbox' in item_vars:
+            item.set_bbox(item_vars['bbox'])
+        if children is not None:
+            item_vars['_objs'] = [self.decode_item(child) for child in children]
+        if isinstance(item, LTLayoutContainer):
+            item_vars['groups'] = None
+        return item
+
+    def decode_value(self, value):
+        if isinstance(value, (tuple, list)):
+            return type(value)(self.decode_value(v) for v in value)
+        if not isinstance(value, dict):
+            return value
+        if id(value) in self.memo:
+            return self.memo[id(value)][1]
+
+        if 'cs' in value:
+            name, ncomponents = value['cs']
+            decoded = PREDEFINED_COLORSPACE.get(name)
+            if decoded is None or decoded.ncomponents != ncomponents:
+                decoded = PDFColorSpace(name, ncomponents)
+        else:
+            decoded = PDFGraphicState()
+            vars(decoded).update({k: self.decode_value(v) for k, v in value['gs'].items()})
+        self.memo[id(value)] = (value, decoded)
+        return decoded
+
+    @classmethod
+    def decode_page(cls, data: bytes) -> LTPage:
+        schemas, root = marshal.loads(zlib.decompress(data))
+        return cls(schemas).decode_item(root)
+
+
+def get_file_hash(file) -> str:
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(1 << 20), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def get_laparams_hash(laparams: LAParams) -> str:
+    return hashlib.sha256(repr(sorted(vars(laparams).items())).encode()).hexdigest()[:16]
+
+
+def resolve_metadata(metadata: dict) -> dict:
+    """Document info with references resolved, keeping only plain values."""
+    resolved = {}
+    for key, value in metadata.items():
+        value = resolve1(value)
+        if value is None or isinstance(value, (bool, int, float, str, bytes)):
+            resolved[key] = value
+    return resolved
+
+
+class LayoutCache:
+    """On-disk cache of laid-out pages, keyed by the PDF content hash and the layout parameters.
+
+    An entry is a directory holding the document metadata and page count, and one compressed file per
+    page laid out so far, so documents that are only partly read are cached as far as they were read.
+    Files are written atomically, so concurrent workers can share a cache directory. An entry that
+    cannot be decoded counts as missing.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, file, laparams: LAParams) -> str:
+        return f'{get_file_hash(file)}-{get_laparams_hash(laparams)}-v{CACHE_VERSION}-{pdfminer.__version__}'
+
+    def get_path(self, key: str, name: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key, name)
+
+    def write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+
+    def read(self, path: str):
+        try:
+            with open(path, 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def load_document(self, key: str):
+        """`(metadata, page count)` of a cached document, or None."""
+        data = self.read(self.get_path(key, 'document.bin'))
+        if data is None:
+            return None
+        try:
+            metadata, page_count = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            return None
+        return (metadata, page_count) if isinstance(metadata, dict) and isinstance(page_count, int) else None
+
+    def save_document(self, key: str, metadata: dict, page_count: int):
+        self.write(self.get_path(key, 'document.bin'), marshal.dumps((resolve_metadata(metadata), page_count)))
+
+    def load_page(self, key: str, index: int):
+        data = self.read(self.get_path(key, f'page-{index}.bin'))
+        page = None
+        if data is not None:
+            try:
+                page = LayoutDecoder.decode_page(data)
+                page = page if isinstance(page, LTPage) else None
+            except (zlib.error, EOFError, ValueError, TypeError, KeyError, IndexError, AttributeError):
+                page = None
+        if page is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return page
+
+    def save_page(self, key: str, index: int, page: LTPage):
+        self.write(self.get_path(key, f'page-{index}.bin'), LayoutEncoder().encode_page(page))
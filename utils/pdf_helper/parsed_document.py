@@ -0,0 +1,210 @@
+import io
+import os
+from collections.abc import Sequence
+from itertools import islice
+from contextlib import contextmanager
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTPage
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from utils.pdf_helper.title_index import TitleIndex
+from utils.pdf_helper.layout_cache import LayoutCache, resolve_metadata
+from utils.trace_helper import span
+from settings import LAYOUT_CACHE_DIR
+
+
+def get_default_layout_cache():
+    return LayoutCache(LAYOUT_CACHE_DIR) if LAYOUT_CACHE_DIR else None
+
+
+def open_input(fp):
+    """Binary file for a path, the bytes of a PDF or a binary file object, and whether it is ours to close."""
+    if isinstance(fp, (str, os.PathLike)):
+        return open(fp, 'rb'), True
+    if isinstance(fp, (bytes, bytearray, memoryview)):
+        return io.BytesIO(fp), True
+    return fp, False
+
+
+def get_declared_page_count(document: PDFDocument):
+    """Page count declared by the root of the page tree, or None."""
+    try:
+        count = resolve1(resolve1(document.catalog['Pages'])['Count'])
+    except (KeyError, TypeError):
+        return None
+    return count if isinstance(count, int) else None
+
+
+class LazyPages(Sequence):
+    """Sequence of laid-out pages; each page is laid out on first access and then kept."""
+
+    def __init__(self, document):
+        self.document = document
+        self._pages = {}
+
+    def __len__(self):
+        return self.document.page_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        index = range(len(self))[index]
+        if index not in self._pages:
+            self._pages[index] = self.document.layout_page(index)
+        return self._pages[index]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_laid_out(self, index):
+        return self._pages.get(index)
+
+
+class ParsedDocument:
+    """A PDF opened and xref-parsed once, shared by the connectors and the doc helpers.
+
+    The file handle, the `PDFDocument`, its metadata and the page tree are built when the
+    document is opened; the layout analysis of a page only runs when the page is first read.
+    `page_numbers` restricts the document to a set of zero-indexed pages, like the selection of
+    `extract_pages`: the page tree is only walked up to the last selected page and any other page
+    is refused.
+    With a `layout_cache` (by default one in `LAYOUT_CACHE_DIR`, when set; `False` for none) pages
+    come from the cache when they were laid out before with the same layout parameters; the PDF is
+    then only parsed if a page is missing.
+    With `columnar` pages are handed out as array-backed `ColumnarPage`s instead of `LTPage`s.
+    `fp` is a path, the bytes of a PDF or a binary file object, e.g. an upload; `name` defaults to the
+    file name, which the connectors read the source document (and some the date) from. A file object
+    is left open.
+    """
+
+    def __init__(self, fp, laparams: LAParams = None, caching: bool = True, page_numbers=None,
+                 layout_cache: LayoutCache = None, columnar: bool = False, name: str = None):
+        self.path = fp if isinstance(fp, (str, os.PathLike)) else None
+        self.name = name or os.path.basename(self.path or getattr(fp, 'name', None) or 'document.pdf')
+        self.laparams = LAParams() if laparams is None else laparams
+        self.caching = caching
+        self.page_numbers = None if page_numbers is None else frozenset(page_numbers)
+        self.columnar = columnar
+        if layout_cache is None:
+            layout_cache = get_default_layout_cache()
+        self.layout_cache = None if layout_cache is False else layout_cache
+        self.document = None
+        self.file, self.owns_file = open_input(fp)
+        try:
+            with span('open', document=self.name):
+                self.open()
+        except Exception:
+            self.close()
+            raise
+
+        self.pages = LazyPages(self)
+        self.pages_laid_out = 0
+        self.title_index = TitleIndex(self.pages)
+
+    def open(self):
+        cached = None
+        if self.layout_cache is not None:
+            self.cache_key = self.layout_cache.get_key(self.file, self.laparams)
+            cached = self.layout_cache.load_document(self.cache_key)
+
+        if cached is not None:
+            self.metadata, self.page_count = cached
+            if self.page_numbers is not None:
+                self.page_count = min(self.page_count, max(self.page_numbers, default=-1) + 1)
+            return
+
+        self.parse()
+        # resolved as when read from the cache, so that the metadata does not depend on the cache
+        self.metadata = resolve_metadata(self.document.info[0]) if self.document.info else {}
+        self.page_count = len(self.pdf_pages)
+        if self.layout_cache is not None:
+            # with a page selection the page tree was only walked up to the last selected page
+            page_count = self.page_count if self.page_numbers is None else get_declared_page_count(self.document)
+            if page_count is not None:
+                self.layout_cache.save_document(self.cache_key, self.metadata, page_count)
+
+    def parse(self):
+        self.document = PDFDocument(PDFParser(self.file), caching=self.caching)
+        pdf_pages = PDFPage.create_pages(self.document)
+        if self.page_numbers is not None:
+            pdf_pages = islice(pdf_pages, max(self.page_numbers, default=-1) + 1)
+        self.pdf_pages = list(pdf_pages)
+
+        resource_manager = PDFResourceManager(caching=self.caching)
+        self.device = PDFPageAggregator(resource_manager, laparams=self.laparams)
+        self.interpreter = PDFPageInterpreter(resource_manager, self.device)
+
+    def layout_page(self, index: int):
+        page = self.layout_tree(index)
+        if not self.columnar:
+            return page
+        # NumPy is only imported for columnar pages
+        from utils.pdf_helper.columnar_page import ColumnarPage
+        return ColumnarPage.from_layout(page)
+
+    def layout_tree(self, index: int) -> LTPage:
+        if self.page_numbers is not None and index not in self.page_numbers:
+            raise IndexError(f'page {index} of {self.name} is not in the selected pages {sorted(self.page_numbers)}')
+        if self.layout_cache is not None:
+            with span('layout_cache_load', page=index):
+                page = self.layout_cache.load_page(self.cache_key, index)
+            if page is not None:
+                return page
+
+        with span('layout', page=index):
+            if self.document is None:
+                self.parse()
+            # keep `pageid` 1-based and positional, as with `extract_pages`, whatever the access order
+            self.device.pageno = index + 1
+            self.interpreter.process_page(self.pdf_pages[index])
+            self.pages_laid_out += 1
+            page = self.device.get_result()
+        if self.layout_cache is not None:
+            self.layout_cache.save_page(self.cache_key, index, page)
+        return page
+
+    def iter_pages(self, start: int = 0, until=None):
+        """Stream laid-out pages in order without keeping them.
+
+        Layout only runs when the next page is requested, so a caller that stops iterating (e.g. on a
+        stop string) never pays for the remaining pages. Pages already laid out are reused.
+        `until` is an optional predicate on a laid-out page: iteration ends, without yielding it, at
+        the first page for which it is true.
+        """
+        for index in range(start, self.page_count):
+            if self.page_numbers is not None and index not in self.page_numbers:
+                continue
+            page = self.pages.get_laid_out(index)
+            page = page if page is not None else self.layout_page(index)
+            if until is not None and until(page):
+                return
+            yield page
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def open_document(fp, **kwargs):
+    """Yield a `ParsedDocument` for a path, PDF bytes or a file object, or pass an already opened
+    document through untouched.
+
+    An already opened document keeps its own page selection and layout parameters.
+    """
+    if isinstance(fp, ParsedDocument):
+        yield fp
+        return
+
+    with ParsedDocument(fp, **kwargs) as doc:
+        yield doc
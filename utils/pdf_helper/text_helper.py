@@ -1,34 +1,44 @@
-from typing import List
 from pdfminer.layout import LTTextContainer, LTChar, LTTextLineHorizontal, LTTextBoxHorizontal
 import unicodedata, re
+from functools import lru_cache
 from settings import FOOTER_FONT, STOP_STRINGS
+from utils.trace_helper import traced
 
 
-class Trie:
-    def __init__(self):
-        self.children = {}
-        self.is_end = False
-
-    def builder(self, str_list):
-        root = Trie()
-        for string in str_list:
-            cur_node = root
-            for char in string:
-                if char not in cur_node.children:
-                    cur_node.children[char] = Trie()
-                cur_node = cur_node.children[char]
-            cur_node.is_end = True
-        return root
-
-    def retriever(self, query, root):
-        cur_node = root
-        for char in query:
-            if char not in cur_node.children:
-                return False
-            cur_node = cur_node.children[char]
-            if cur_node.is_end:
-                return True
-        return False
+class PatternMatcher:
+    """Multi-pattern literal matcher compiled once per pattern set and reused on every text.
+
+    The patterns are compiled into a single regular expression alternation, so a scan is one pass in
+    the regex engine instead of one trie walk per character offset.
+    """
+
+    def __init__(self, patterns):
+        # longest first, so that at a given position the longest pattern wins
+        self.patterns = sorted({pattern for pattern in patterns if pattern}, key=len, reverse=True)
+        alternation = '|'.join(re.escape(pattern) for pattern in self.patterns)
+        self.regex = re.compile(alternation) if self.patterns else None
+        self.overlap_regex = re.compile(f'(?=({alternation}))') if self.patterns else None
+
+    def first_match_pos(self, text: str):
+        """Start position of the leftmost occurrence of any pattern, or None."""
+        if self.regex is None:
+            return None
+        match = self.regex.search(text)
+        return match.start() if match else None
+
+    def find_all(self, text: str) -> list[tuple[int, str]]:
+        """`(start, pattern)` of every occurrence, overlapping ones included; the longest pattern per start."""
+        if self.overlap_regex is None:
+            return []
+        return [(match.start(), match.group(1)) for match in self.overlap_regex.finditer(text)]
+
+
+@lru_cache(maxsize=None)
+def get_matcher(patterns: tuple) -> PatternMatcher:
+    return PatternMatcher(patterns)
+
+
+STOP_STRING_MATCHER = get_matcher(tuple(STOP_STRINGS))
 
 
 def concat_lines(text: str) -> str:
@@ -45,22 +55,40 @@ def is_non_text(text):
     return match is not None
 
 
+class ControlCharTable(dict):
+    """`str.translate` table deleting every character of the Unicode `C*` categories.
+
+    The category of a code point is looked up once, the first time it is seen, and memoised.
+    """
+
+    def __missing__(self, code_point):
+        value = None if unicodedata.category(chr(code_point))[0] == 'C' else code_point
+        self[code_point] = value
+        return value
+
+
+CONTROL_CHAR_TABLE = ControlCharTable()
+
+
 def remove_uncommon_utf8(text) -> str:
-    filtered_text = ""
-    for char in text:
-        if unicodedata.category(char)[0] == 'C':
-            continue
-        filtered_text += char
-    return filtered_text
+    return text.translate(CONTROL_CHAR_TABLE)
+
+
+def normalise_text(text: str, legal_str: str = None) -> str:
+    """Remove hyphenation, join lines and strip control characters, then the legal disclaimer if given.
+
+    Same result as `remove_hyphenation`, `concat_lines`, `remove_uncommon_utf8` and
+    `remove_legal_disclaimer` applied in turn: line breaks are control characters, so the
+    translation strips them together with the others.
+    """
+    text = text.replace('-\n', '').translate(CONTROL_CHAR_TABLE)
+    if legal_str:
+        text = text.replace(legal_str, '')
+    return text
 
 
 def get_substr_first_pos(query, str_list):
-    trie = Trie()
-    root = trie.builder(str_list)
-    for i in range(len(query)):
-        if trie.retriever(query[i:], root):
-            return i
-    return None
+    return get_matcher(tuple(str_list)).first_match_pos(query)
 
 
 def remove_subtext(text, rm_text):
@@ -103,17 +131,18 @@ def get_char_colors(element: LTTextContainer) -> set[str]:
     return color_space_set
 
 
-def clean_text(text_list, remove_stop_str=False):
-    text = ''.join(text_list)
-    text = remove_hyphenation(text)
-    text = concat_lines(text)
-    text = remove_uncommon_utf8(text)
+@traced('clean_text')
+def clean_text(text_list, remove_stop_str=False, legal_str=None):
+    text = normalise_text(''.join(text_list), legal_str)
 
     if not remove_stop_str:
         return text
+    return cut_at_stop_str(text)
+
 
+def cut_at_stop_str(text: str):
     early_stop = False
-    rm_start_pos = get_substr_first_pos(text, STOP_STRINGS)
+    rm_start_pos = STOP_STRING_MATCHER.first_match_pos(text)
     if rm_start_pos is not None:
         early_stop = True
         text = text[:rm_start_pos]
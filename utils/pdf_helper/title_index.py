@@ -0,0 +1,60 @@
+from pdfminer.layout import LTTextContainer, LTChar
+
+# joins the element texts of a page; titles never contain it, so a title cannot match across elements
+ELEMENT_SEPARATOR = '\x00'
+
+
+class PageTitles:
+    """The text of every text element of one page, with the font size and bold flag of the first-line characters."""
+
+    def __init__(self, page):
+        self.texts = []
+        self.first_line_styles = []
+        for element in page:
+            if not isinstance(element, LTTextContainer):
+                continue
+            self.texts.append(element.get_text())
+            first_line = list(element)[0] if len(element) > 0 else []
+            # (size, is bold) per item of the first line, None for the items that are not characters
+            self.first_line_styles.append([(int(item.size), item.fontname.endswith('Bold'))
+                                           if isinstance(item, LTChar) else None for item in first_line])
+        self.text = ELEMENT_SEPARATOR.join(self.texts)
+
+
+class TitleIndex:
+    """Section titles of a document, indexed in a single pass over its laid-out pages.
+
+    Each page is read once, the first time a query needs it, so a query only lays out pages up to the
+    first match and every later query reuses what earlier ones indexed.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_titles = []
+
+    def iter_page_titles(self):
+        for page_number, page_titles in enumerate(self.page_titles):
+            yield page_number, page_titles
+        while len(self.page_titles) < len(self.pages):
+            self.page_titles.append(PageTitles(self.pages[len(self.page_titles)]))
+            yield len(self.page_titles) - 1, self.page_titles[-1]
+
+    def get_page_number_from_title(self, title: str) -> int:
+        """Zero-indexed first page with an element containing `title`, 0 if there is none."""
+        for page_number, page_titles in self.iter_page_titles():
+            if title in page_titles.text:
+                return page_number
+        return 0
+
+    def get_page_number_from_font(self, title: str, font_size: int, bold: bool = False) -> int:
+        """One-indexed first page with an element starting with `title` set in `font_size` (and bold), 0 if none."""
+        for page_number, page_titles in self.iter_page_titles():
+            if title not in page_titles.text:
+                continue
+            for text, styles in zip(page_titles.texts, page_titles.first_line_styles):
+                if not text.startswith(title):
+                    continue
+                title_styles = [style for style in styles[0:len(title)] if style is not None]
+                if all(size == font_size and (is_bold or not bold) for size, is_bold in title_styles):
+                    return page_number + 1
+        return 0
@@ -8,44 +8,64 @@ from utils.pdf_helper.text_helper import is_header_match, remove_footer, get_cha
 import numpy as np
 import pandas as pd
 
+def get_table_boxes(page, ymin, ymax):
+    """Text boxes strictly between `ymin` and `ymax` (in page order), with their y0 / x1 as arrays, and the y0 of the lines."""
+    elements, line_y0 = [], []
+    for el in page:
+        if not (el.y0 > ymin and el.y0 < ymax):
+            continue
+        if isinstance(el, LTTextBoxHorizontal) and el.x0 > -1 and el.x0 < 1000:
+            elements.append(el)
+        elif isinstance(el, LTLine):
+            line_y0.append(el.y0)
+    y0 = np.array([el.y0 for el in elements], dtype=np.float64)
+    x1 = np.array([el.x1 for el in elements], dtype=np.float64)
+    return elements, y0, x1, np.array(line_y0, dtype=np.float64)
+
+
+def assign_rows(y0, row_lim):
+    """Row of each box, given the descending row delimiters; -1 for a box sitting on a delimiter or outside."""
+    bounds = row_lim[::-1]
+    pos = np.searchsorted(bounds, y0, side='left')
+    inside = (pos > 0) & (pos < len(bounds))
+    inside[inside] = bounds[pos[inside]] != y0[inside]
+    return np.where(inside, len(bounds) - 1 - pos, -1)
+
+
 def table_extractor(page, ymin, ymax, xmin = -1, xmax =10000, row_lines = True, has_header = False):
-    elements = [el for el in page if (el.y0 > ymin and el.y0 < ymax and el.x0 >-1 and el.x0 < 1000 and isinstance(el, LTTextBoxHorizontal))]
-    table, cnt = [], []
-    table_formatted = []
+    elements, y0, x1, line_y0 = get_table_boxes(page, ymin, ymax)
+    texts = [el.get_text() for el in elements]
 
     # Get row delimiters 
-    if row_lines: 
-        row_lim = np.unique([el.y0 for el in page if (el.y0 > ymin and el.y0 < ymax and isinstance(el, LTLine))])
-    else: 
-        row_lim = np.unique([el.y0 for el in elements])
-    row_lim = [ymax] + list(- np.sort(-np.array(row_lim))) + [ymin]
+    row_lim = np.unique(line_y0 if row_lines else y0)
+    row_lim = np.concatenate(([ymax], row_lim[::-1], [ymin])).astype(np.float64)
+
+    # Assign every box to its row, keeping page order within a row
+    rows = assign_rows(y0, row_lim)
+    n_rows = len(row_lim) - 1
+    order = np.argsort(rows, kind='stable')
+    order = order[rows[order] >= 0]
+    cnt = np.bincount(rows[order], minlength=n_rows)
+    row_start = np.concatenate(([0], np.cumsum(cnt)))
 
     # Get number of columns (based on majority formatting of rows)
-    for i in range(len(row_lim)-1):
-        ymin_row, ymax_row = row_lim[i+1], row_lim[i]
-        row = [el for el in elements if (el.y0 > ymin_row and el.y0 <ymax_row)]
-        cnt.append(len(row))
-        table.append(row)
     n_cols = np.bincount(cnt).argmax()
 
-    # Get column delimiters
-    col_lim = np.zeros(n_cols)
-    for i in range(n_cols):
-        col_lim[i] = max([row[i].x1 for row in table if (len(row)==n_cols)])
-    col_lim = [xmin] + list(col_lim)
+    # Get column delimiters: the i-th box of the rows that have n_cols boxes
+    full_rows = np.flatnonzero(cnt == n_cols)
+    full_boxes = order[row_start[full_rows][:, None] + np.arange(n_cols)]
+    col_lim = np.concatenate(([xmin], x1[full_boxes].max(axis=0) if n_cols else []))
     col_lim[-1] = xmax
 
     # Format each row in table to match the number of columns
-    for row in table:   
-        if len(row) == n_cols:
-            table_formatted.append([clean_text(el.get_text()) for el in row])
-        else: 
-            row_good_format = []
-            for i in range(len(col_lim)-1):
-                xmin_col, xmax_col = col_lim[i], col_lim[i+1]
-                col_element = clean_text([el.get_text() for el in row if el.x1 > xmin_col and el.x1 <= xmax_col])
-                row_good_format.append(col_element)
-            table_formatted.append(row_good_format)
+    in_col = (x1[:, None] > col_lim[:-1]) & (x1[:, None] <= col_lim[1:])
+    table_formatted = []
+    for i in range(n_rows):
+        row = order[row_start[i]:row_start[i + 1]]
+        if cnt[i] == n_cols:
+            table_formatted.append([clean_text(texts[j]) for j in row])
+        else:
+            table_formatted.append([clean_text([texts[j] for j in row[in_col[row, col]]]) for col in range(n_cols)])
     table_formatted = np.array(table_formatted)
 
     if (table_formatted[0,:]=="").all():
@@ -62,6 +82,17 @@ def table_extractor(page, ymin, ymax, xmin = -1, xmax =10000, row_lines = True,
     return table_formatted
 
 
+def group_rows_by_y0(elements):
+    """Boxes sharing the same y0, as rows from the top of the page down, in page order within a row."""
+    if not elements:
+        return []
+    y0 = np.array([el.y0 for el in elements], dtype=np.float64)
+    row_y0, rows = np.unique(-y0, return_inverse=True)
+    order = np.argsort(rows, kind='stable')
+    row_start = np.cumsum(np.bincount(rows, minlength=len(row_y0)))[:-1]
+    return [[elements[j] for j in row] for row in np.split(order, row_start)]
+
+
 def get_n_th_line_height(page, n):
     lines = [el.y0 for el in page if isinstance(el, LTLine)]
     return np.partition(lines, n)[n]
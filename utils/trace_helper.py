@@ -0,0 +1,178 @@
+import atexit
+import contextvars
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from settings import TRACE_PATH
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """A named, timed stage; nested spans are tagged with the document of the enclosing spans.
+
+    Besides its duration a span records its self time, the part not spent in nested spans, so that
+    e.g. the connector logic is told apart from the layout analysis and `clean_text` calls it makes.
+    """
+    __slots__ = ('tracer', 'name', 'args', 'parent', 'document', 'token', 'ts', 'start', 'children_ns')
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self.document = self.args.get('document') or (self.parent.document if self.parent is not None else None)
+        self.token = _current_span.set(self)
+        self.children_ns = 0
+        self.ts = time.time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        _current_span.reset(self.token)
+        if self.parent is not None:
+            self.parent.children_ns += duration
+        self.tracer.record(self, duration)
+        return False
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Collects spans as Chrome trace events (`chrome://tracing`, Perfetto) while enabled.
+
+    Disabled, `span` hands out a shared no-op context manager, so instrumented code only pays for a
+    function call and an attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []
+        self.lock = threading.Lock()
+
+    def enable(self, path: str = None):
+        """Start recording; with a `path` the trace is saved there when the main process exits."""
+        if path and self.path is None and multiprocessing.parent_process() is None:
+            atexit.register(self.save_at_exit)
+        self.path = path or self.path
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, span: Span, duration_ns: int):
+        args = dict(span.args)
+        if span.document is not None:
+            args['document'] = span.document
+        args['self_ms'] = max(duration_ns - span.children_ns, 0) / 1e6
+        event = {'name': span.name, 'cat': 'lpds', 'ph': 'X', 'ts': span.ts / 1000, 'dur': duration_ns / 1000,
+                 'pid': os.getpid(), 'tid': threading.get_native_id(), 'args': args}
+        with self.lock:
+            self.events.append(event)
+
+    def extend(self, events: list):
+        """Add the events recorded by another process, e.g. a pool worker."""
+        with self.lock:
+            self.events += events
+
+    @contextmanager
+    def collect(self):
+        """Move the events recorded inside the block into the yielded list, to send them to another process."""
+        events = []
+        with self.lock:
+            start = len(self.events)
+        try:
+            yield events
+        finally:
+            with self.lock:
+                events += self.events[start:]
+                del self.events[start:]
+
+    def save(self, path: str = None):
+        path = path or self.path
+        with self.lock:
+            events = list(self.events)
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'summary': summarise(events)}, trace_file)
+        return path
+
+    def save_at_exit(self):
+        if self.events:
+            print(f'Trace written to {self.save()}')
+
+
+def summarise(events: list) -> dict:
+    """Aggregate timings per stage, and per stage of each document, in milliseconds."""
+    stages, documents = {}, {}
+    for event in events:
+        duration, self_time = event['dur'] / 1000, event['args']['self_ms']
+        stage = stages.setdefault(event['name'], {'count': 0, 'total_ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0})
+        stage['count'] += 1
+        stage['total_ms'] += duration
+        stage['self_ms'] += self_time
+        stage['max_ms'] = max(stage['max_ms'], duration)
+        document = event['args'].get('document')
+        if document is not None:
+            document_stages = documents.setdefault(document, {})
+            document_stages[event['name']] = document_stages.get(event['name'], 0.0) + self_time
+    return {'stages': stages, 'documents': documents}
+
+
+tracer = Tracer()
+if TRACE_PATH:
+    tracer.enable(TRACE_PATH)
+
+
+def span(name: str, **args):
+    """`with span('layout', page=3):` times the block when tracing is enabled."""
+    return tracer.span(name, **args)
+
+
+def traced(name: str):
+    """Decorator timing every call of a function as a span called `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def print_summary(path: str):
+    with open(path) as trace_file:
+        stages = json.load(trace_file)['summary']['stages']
+    print(f"{'stage':>20} {'count':>8} {'total ms':>11} {'self ms':>11} {'mean ms':>9} {'max ms':>9}")
+    for name, stage in sorted(stages.items(), key=lambda item: -item[1]['self_ms']):
+        print(f"{name:>20} {stage['count']:>8} {stage['total_ms']:>11.1f} {stage['self_ms']:>11.1f} "
+              f"{stage['total_ms'] / stage['count']:>9.2f} {stage['max_ms']:>9.2f}")
+
+
+if __name__ == '__main__':
+    print_summary(sys.argv[1])